@@ -0,0 +1,113 @@
+# batch_forecast.py
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import daycall_query
+import daycall_rollup
+
+base_path = os.path.dirname(__file__)
+FORECAST_DIR = os.path.join(base_path, 'data', 'forecast_store')
+FORECAST_PATH = os.path.join(FORECAST_DIR, 'daycall_forecast.parquet')
+
+
+def build_matrix(daily, value='총처리호'):
+    # (팀명, 쇼핑몰명) 최하위 시계열 x 영업일 행렬. 0건 행은 저장소에 없으므로 빈 칸은 0으로 채움
+    days = pd.bdate_range(daily['날짜'].min(), daily['날짜'].max())
+    keys = daily[['팀명', '쇼핑몰명']].drop_duplicates().sort_values(['팀명', '쇼핑몰명']).reset_index(drop=True)
+    row = pd.MultiIndex.from_frame(keys.astype(str)).get_indexer(pd.MultiIndex.from_frame(daily[['팀명', '쇼핑몰명']].astype(str)))
+    col = days.get_indexer(daily['날짜'])
+    matrix = np.zeros((len(keys), len(days)))
+    np.add.at(matrix, (row, col), daily[value].to_numpy(dtype=float))
+    return keys, days, matrix
+
+
+def fit_forecast(matrix, days, horizon=20, alpha=0.3, season_weeks=8):
+    # 모든 시계열을 한 번에: 최근 season_weeks주 요일 효과(가법) + 요일 효과를 뺀 값의 단순지수평활 수준
+    # 전체 건수가 0인 영업일(휴일, 미수집일)은 요일 효과와 수준 갱신에서 제외 (daycall_anomaly와 같은 기준)
+    weekdays = days.weekday.to_numpy()
+    open_days = matrix.sum(axis=0) > 0
+    future_days = pd.bdate_range(days[-1] + pd.offsets.BDay(1), periods=horizon)
+    if not open_days.any():
+        return future_days, np.zeros((matrix.shape[0], horizon))
+
+    recent = np.zeros(len(days), dtype=bool)
+    recent[max(0, len(days) - season_weeks * 5):] = True
+    recent &= open_days
+    series_mean = matrix[:, recent].mean(axis=1) if recent.any() else np.zeros(matrix.shape[0])
+    effects = np.zeros((matrix.shape[0], 5))
+    for weekday in range(5):
+        mask = recent & (weekdays == weekday)
+        if mask.any():
+            effects[:, weekday] = matrix[:, mask].mean(axis=1) - series_mean
+
+    deseasonalized = matrix - effects[:, weekdays]
+    open_columns = np.flatnonzero(open_days)
+    level = deseasonalized[:, open_columns[0]].copy()
+    for t in open_columns[1:]:
+        level = alpha * deseasonalized[:, t] + (1 - alpha) * level
+
+    forecast = np.clip(level[:, None] + effects[:, future_days.weekday.to_numpy()], 0, None)
+    return future_days, forecast
+
+
+def reconcile(keys, bottom, total):
+    # top-down: 최하위 예측을 전체 예측에 맞게 비율 조정한 뒤 팀/업체 합계를 다시 집계해 계층 합이 항상 일치
+    bottom_sum = bottom.sum(axis=0)
+    share = np.divide(bottom, bottom_sum, out=np.full_like(bottom, 1 / len(bottom)), where=bottom_sum > 0)
+    reconciled = share * total
+    team_codes, teams = pd.factorize(keys['팀명'].astype(str))
+    mall_codes, malls = pd.factorize(keys['쇼핑몰명'].astype(str))
+    team_forecast = np.zeros((len(teams), reconciled.shape[1]))
+    mall_forecast = np.zeros((len(malls), reconciled.shape[1]))
+    np.add.at(team_forecast, team_codes, reconciled)
+    np.add.at(mall_forecast, mall_codes, reconciled)
+    return {'전체': (['전체'], total[None, :]), '팀명': (list(teams), team_forecast), '쇼핑몰명': (list(malls), mall_forecast)}
+
+
+def run_batch(horizon=20, alpha=0.3, season_weeks=8):
+    daycall_rollup.sync()
+    daily = daycall_query.daily_rows(columns=('날짜', '팀명', '쇼핑몰명', '총처리호'))
+    if daily.empty:
+        return pd.DataFrame(columns=['level', 'name', '날짜', '예측처리호'])
+    keys, days, matrix = build_matrix(daily)
+
+    future_days, bottom = fit_forecast(matrix, days, horizon=horizon, alpha=alpha, season_weeks=season_weeks)
+    _, total = fit_forecast(matrix.sum(axis=0, keepdims=True), days, horizon=horizon, alpha=alpha, season_weeks=season_weeks)
+
+    frames = []
+    for level, (names, forecast) in reconcile(keys, bottom, total[0]).items():
+        frames.append(pd.DataFrame({
+            'level': level,
+            'name': np.repeat(names, len(future_days)),
+            '날짜': np.tile(future_days, len(names)),
+            '예측처리호': forecast.ravel(),
+        }))
+    df_forecast = pd.concat(frames, ignore_index=True)
+
+    os.makedirs(FORECAST_DIR, exist_ok=True)
+    tmp_path = f'{FORECAST_PATH}.{os.getpid()}.tmp'
+    df_forecast.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, FORECAST_PATH)
+    return df_forecast
+
+
+def load_forecast():
+    if not os.path.exists(FORECAST_PATH):
+        return pd.DataFrame(columns=['level', 'name', '날짜', '예측처리호'])
+    return pd.read_parquet(FORECAST_PATH)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='팀/업체별 콜 처리량 일괄 예측 (야간 배치)')
+    parser.add_argument('--horizon', type=int, default=20, help='예측 영업일 수')
+    parser.add_argument('--alpha', type=float, default=0.3)
+    parser.add_argument('--season-weeks', type=int, default=8)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df_forecast = run_batch(horizon=args.horizon, alpha=args.alpha, season_weeks=args.season_weeks)
+    print(f"{df_forecast['name'].nunique()} series, {len(df_forecast)} rows in {time.perf_counter() - start:.2f}s -> {FORECAST_PATH}")
@@ -0,0 +1,67 @@
+# benchmarks/import_time.py
+# 탭별 콜드 스타트 import 시간: 탭마다 새 인터프리터에서 python -X importtime으로 측정
+#   python benchmarks/import_time.py [--top 10] [--output import_time.json]
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main.py가 탭 선택 시 import하는 모듈 (공통: streamlit, perf_trace)
+TAB_MODULES = {
+    'READ ME': [],
+    'SIIC 운영현황': ['mall_daycall'],
+    'SIIC 운영실적': ['profit_month'],
+    'SIIC 수요예측': ['demand_forecasting'],
+    'SIIC Reporting': ['report_page'],
+}
+COMMON_MODULES = ['streamlit', 'perf_trace']
+
+
+def measure_imports(modules):
+    # -X importtime 출력(stderr): "import time: self [us] | cumulative | imported package"
+    code = ''.join(f'import {module}\n' for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=base_path, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append({'module': name.strip(), 'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+                        'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    return imports
+
+
+def tab_report(top=10):
+    report = {}
+    for tab, modules in TAB_MODULES.items():
+        imports = measure_imports(COMMON_MODULES + modules)
+        top_level = [entry for entry in imports if entry['depth'] == 0]
+        heaviest = sorted((entry for entry in imports if entry['depth'] <= 1), key=lambda entry: entry['cumulative_ms'], reverse=True)
+        report[tab] = {
+            'total_ms': sum(entry['cumulative_ms'] for entry in top_level),
+            'modules': len(imports),
+            'top_level': {entry['module']: entry['cumulative_ms'] for entry in top_level},
+            'heaviest': heaviest[:top],
+        }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='탭별 콜드 스타트 import 시간 측정')
+    parser.add_argument('--top', type=int, default=10, help='탭별로 표시할 무거운 모듈 수')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    report = tab_report(args.top)
+    for tab, result in report.items():
+        print(f"{tab:<16} {result['total_ms']:8.0f}ms  ({result['modules']} modules)")
+        for entry in result['heaviest']:
+            print(f"    {'  ' * entry['depth']}{entry['module']:<40} {entry['cumulative_ms']:8.0f}ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
@@ -0,0 +1,265 @@
+# benchmarks/load_test.py
+# main.py를 AppTest로 여러 세션 동시에 실행하는 부하 테스트 (합성 데이터 사용)
+# 세션마다 탭 전환, 부서/업체 선택, 수요예측 control month 이동을 무작위로 반복하고
+# rerun 지연시간(p50/p95)과 세션별 RSS를 보고
+#   python benchmarks/load_test.py --sessions 8 --steps 20
+#   python benchmarks/load_test.py --sessions 16 --daycall-rows 2000000 --output load.json
+#   python benchmarks/load_test.py --mode thread --sessions 8 --cold
+# --mode process (기본): 세션마다 별도 프로세스 (프로세스 내 st.cache_*는 세션별, 저장소와 공유 결과 캐시는 모든 세션이 공유)
+# --mode thread: 실제 서버처럼 한 프로세스에서 세션마다 스레드. Runtime(st.cache_* 저장소)과 모듈 상태를 모든 세션이
+#   공유하므로 세션 스레드 사이의 경합(같은 임시 파일, 공유 캐시 객체 등)을 재현할 수 있음. RSS는 프로세스 전체 값
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from unittest import mock
+
+import pandas as pd
+from streamlit import logger as st_logger
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, base_path)
+st_logger.set_log_level('error')
+
+from benchmarks import synthetic_data  # noqa: E402
+
+MAIN_PATH = os.path.join(base_path, 'main.py')
+TABS = [
+    ('READ ME', None),
+    ('SIIC Management', 'SIIC 운영현황'),
+    ('SIIC Management', 'SIIC 운영실적'),
+    ('SIIC Management', 'SIIC 수요예측'),
+    ('SIIC Reporting', 'SIIC 월간보고'),
+    ('SIIC Reporting', 'SIIC 일간보고'),
+]
+TEAM_LABEL = '조회 대상 부서를 선택하세요'
+MALL_LABEL = '업체를 선택하세요'
+MONTH_LABEL = 'control month'
+
+
+def _rss_mb():
+    # 현재 RSS와 최대 RSS (리눅스 /proc 기준, 그 외 OS에서는 None)
+    try:
+        with open('/proc/self/status', encoding='utf-8') as f:
+            status = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(status['VmRSS'].split()[0]) / 1024, int(status['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _widget(widgets, label):
+    return next((widget for widget in widgets if widget.label == label), None)
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    # AppTest는 rerun마다 전역 Runtime과 global.appTest 설정을 바꿨다가 되돌리므로 스레드끼리 덮어씀
+    # -> 프로세스에 Runtime 하나를 고정하고, AppTest의 교체는 세션별 임시 객체에만 적용되도록 바꿈
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import patch_config_options
+
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage('/mock/media'))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(Runtime, '_instance', runtime))
+        stack.enter_context(mock.patch.object(app_test, 'Runtime', type('SessionRuntime', (), {'_instance': None})))
+        stack.enter_context(patch_config_options({'global.appTest': True}))
+        stack.enter_context(mock.patch.object(app_test, 'patch_config_options', lambda overrides: contextlib.nullcontext()))
+        yield runtime
+
+
+def prepare_stores(root):
+    # 첫 세션들이 동시에 원본을 저장소에 반영하지 않도록 미리 반영 (--cold이면 생략)
+    import data_catalog
+    import daycall_rollup
+    import daycall_store
+
+    for daycall_file in data_catalog.date_range('mall_daycall'):
+        daycall_store.ingest_csv(daycall_file['path'])
+    daycall_rollup.sync()
+
+
+def run_session(session_id, root, steps, seed, timeout, barrier, results):
+    try:
+        synthetic_data.use_data_dir(root)
+        from streamlit.testing.v1 import AppTest
+        st_logger.set_log_level('error')
+
+        rng = random.Random(seed * 1000 + session_id)
+        at = AppTest.from_file(MAIN_PATH, default_timeout=timeout)
+        reruns = []
+        tab = None
+
+        def rerun(action, element):
+            start = time.perf_counter()
+            element.run()
+            seconds = time.perf_counter() - start
+            rss, peak_rss = _rss_mb()
+            errors = [str(e.value)[:300] for e in at.exception] + [str(e.value)[:300] for e in at.error]
+            reruns.append({'session': session_id, 'action': action, 'tab': tab, 'seconds': seconds,
+                           'rss_mb': rss, 'peak_rss_mb': peak_rss, 'errors': errors})
+
+        barrier.wait()
+        rerun('open', at)
+        for _ in range(steps):
+            main_tab, sub_tab = rng.choice(TABS)
+            tab = sub_tab or main_tab
+            category = _widget(at.sidebar.radio, 'Select a category')
+            if category.value != main_tab:
+                rerun('tab', category.set_value(main_tab))
+            if sub_tab is not None:
+                sub_radio = _widget(at.sidebar.radio, main_tab)
+                if sub_radio.value != sub_tab:
+                    rerun('tab', sub_radio.set_value(sub_tab))
+
+            if sub_tab == 'SIIC 운영현황':
+                for action, label, max_count in (('teams', TEAM_LABEL, 3), ('malls', MALL_LABEL, 5)):
+                    widget = _widget(at.multiselect, label)
+                    if widget is not None and widget.options:
+                        count = rng.randint(1, min(max_count, len(widget.options)))
+                        rerun(action, widget.set_value(rng.sample(list(widget.options), count)))
+            elif sub_tab == 'SIIC 수요예측':
+                slider = _widget(at.slider, MONTH_LABEL)
+                if slider is not None:
+                    months = pd.period_range(pd.Timestamp(slider.min, unit='us'), pd.Timestamp(slider.max, unit='us'), freq='M')
+                    rerun('control_month', slider.set_value(rng.choice(months).to_timestamp().date()))
+
+        rss, peak_rss = _rss_mb()
+        results.put({'session': session_id, 'reruns': reruns, 'rss_mb': rss, 'peak_rss_mb': peak_rss, 'error': None})
+    except Exception:
+        # 시작 전에 실패하면 대기 중인 다른 세션도 멈추지 않도록 barrier 해제
+        barrier.abort()
+        results.put({'session': session_id, 'reruns': [], 'rss_mb': None, 'peak_rss_mb': None,
+                     'error': traceback.format_exc()})
+
+
+def _percentiles(seconds):
+    if not seconds:
+        return {'count': 0, 'p50': None, 'p95': None, 'max': None}
+    ordered = sorted(seconds)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {'count': len(ordered), 'p50': statistics.median(ordered), 'p95': p95, 'max': ordered[-1]}
+
+
+def summarize(sessions):
+    reruns = [rerun for session in sessions for rerun in session['reruns']]
+    by_action = {}
+    for rerun in reruns:
+        by_action.setdefault(rerun['action'], []).append(rerun['seconds'])
+    by_tab = {}
+    for rerun in reruns:
+        if rerun['action'] != 'open':
+            by_tab.setdefault(rerun['tab'], []).append(rerun['seconds'])
+    per_session = [{'session': session['session'], 'reruns': len(session['reruns']),
+                    **{key: value for key, value in _percentiles([r['seconds'] for r in session['reruns']]).items() if key != 'count'},
+                    'rss_mb': session['rss_mb'], 'peak_rss_mb': session['peak_rss_mb'],
+                    'errors': sum(1 for r in session['reruns'] if r['errors']) + (session['error'] is not None)}
+                   for session in sorted(sessions, key=lambda s: s['session'])]
+    return {
+        'overall': _percentiles([r['seconds'] for r in reruns]),
+        'by_action': {action: _percentiles(seconds) for action, seconds in sorted(by_action.items())},
+        'by_tab': {tab: _percentiles(seconds) for tab, seconds in sorted(by_tab.items())},
+        'sessions': per_session,
+        'errors': [{'session': r['session'], 'action': r['action'], 'tab': r['tab'], 'errors': r['errors']} for r in reruns if r['errors']]
+                  + [{'session': s['session'], 'error': s['error']} for s in sessions if s['error']],
+    }
+
+
+def _run_workers(workers, results, n_sessions):
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    sessions = []
+    while len(sessions) < n_sessions:
+        try:
+            sessions.append(results.get(timeout=5))
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+    for worker in workers:
+        worker.join()
+    return sessions, time.perf_counter() - start
+
+
+def run(n_sessions, steps, daycall_rows, seed=0, timeout=600, cold=False, mode='process'):
+    with tempfile.TemporaryDirectory(prefix='siic_load_') as root:
+        synthetic_data.write_data_tree(root, daycall_rows)
+        synthetic_data.use_data_dir(root)
+        if not cold:
+            prepare_stores(root)
+
+        if mode == 'thread':
+            barrier, results = threading.Barrier(n_sessions), queue.Queue()
+            workers = [threading.Thread(target=run_session, args=(i, root, steps, seed, timeout, barrier, results))
+                       for i in range(n_sessions)]
+            with shared_runtime():
+                sessions, elapsed = _run_workers(workers, results, n_sessions)
+        else:
+            context = multiprocessing.get_context('spawn')
+            barrier, results = context.Barrier(n_sessions), context.Queue()
+            workers = [context.Process(target=run_session, args=(i, root, steps, seed, timeout, barrier, results))
+                       for i in range(n_sessions)]
+            sessions, elapsed = _run_workers(workers, results, n_sessions)
+
+    report = {'params': {'sessions': n_sessions, 'steps': steps, 'daycall_rows': daycall_rows, 'seed': seed, 'cold': cold,
+                         'mode': mode},
+              'elapsed': elapsed, 'cpu_count': os.cpu_count(), **summarize(sessions)}
+    missing = n_sessions - len(sessions)
+    if missing:
+        report['errors'].append({'session': None, 'error': f'{missing} session(s) exited without a result'})
+    return report
+
+
+def print_report(report):
+    def row(name, stats):
+        if not stats['count']:
+            return f'{name:<20} {0:>6}'
+        return f"{name:<20} {stats['count']:>6}  p50 {stats['p50']:7.3f}s  p95 {stats['p95']:7.3f}s  max {stats['max']:7.3f}s"
+
+    print(f"sessions {report['params']['sessions']} x steps {report['params']['steps']} ({report['params']['mode']}), "
+          f"{report['elapsed']:.1f}s elapsed on {report['cpu_count']} CPU")
+    print(row('overall', report['overall']))
+    for action, stats in report['by_action'].items():
+        print(row(f'action:{action}', stats))
+    for tab, stats in report['by_tab'].items():
+        print(row(f'tab:{tab}', stats))
+    for session in report['sessions']:
+        rss = f"rss {session['rss_mb']:7.1f}MB  peak {session['peak_rss_mb']:7.1f}MB" if session['rss_mb'] is not None else 'rss n/a'
+        p50 = f"p50 {session['p50']:7.3f}s  p95 {session['p95']:7.3f}s" if session['reruns'] else 'no reruns'
+        print(f"session {session['session']:<12} {session['reruns']:>6}  {p50}  {rss}  errors {session['errors']}")
+    for error in report['errors'][:10]:
+        print('error', json.dumps(error, ensure_ascii=False)[:500])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='동시 세션 부하 테스트 (합성 데이터)')
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--steps', type=int, default=10, help='세션당 탭 이동 횟수 (이동한 탭의 위젯 조작 포함)')
+    parser.add_argument('--daycall-rows', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=600, help='rerun 하나의 최대 시간(초)')
+    parser.add_argument('--cold', action='store_true', help='저장소를 미리 만들지 않고 첫 세션들이 원본을 반영')
+    parser.add_argument('--mode', choices=['process', 'thread'], default='process',
+                        help='세션마다 프로세스 또는 한 프로세스 안의 스레드 (공유 캐시/세션 스레드 경합 재현)')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    report = run(args.sessions, args.steps, args.daycall_rows, seed=args.seed, timeout=args.timeout, cold=args.cold, mode=args.mode)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
@@ -0,0 +1,241 @@
+# benchmarks/run_benchmarks.py
+# 합성 데이터로 모듈별 주요 경로(일별 콜 로드, 팀/업체 집계, 손익 KPI, SARIMAX 학습)의 소요시간을 측정
+#   python benchmarks/run_benchmarks.py                       # 기본 크기
+#   python benchmarks/run_benchmarks.py --daycall-rows 10000000 --output bench.json
+#   python benchmarks/run_benchmarks.py --compare bench.json  # 이전 결과 대비 비율 출력
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from streamlit import logger as st_logger
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, base_path)
+# bare mode 캐시 경고는 측정 출력과 섞이지 않도록 숨김
+st_logger.set_log_level('error')
+
+import call_scenario  # noqa: E402
+import daycall_index  # noqa: E402
+import daycall_query  # noqa: E402
+import daycall_rollup  # noqa: E402
+import daycall_store  # noqa: E402
+import mall_daycall  # noqa: E402
+import model_cache  # noqa: E402
+import model_selection  # noqa: E402
+import profit_kpi  # noqa: E402
+import profit_store  # noqa: E402
+from benchmarks import synthetic_data  # noqa: E402
+
+
+def measure(name, func, repeat=3, setup=None, track_memory=False, **params):
+    # setup()은 측정 전에 매번 호출 (콜드 측정용 초기화). 최솟값/중앙값과 마지막 반환값을 기록
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    record = {'name': name, 'params': params, 'min': min(seconds), 'median': statistics.median(seconds), 'runs': seconds}
+    if track_memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        func()
+        record['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    print(f"{name:<32} {json.dumps(params, ensure_ascii=False):<40} min {record['min']:8.3f}s  median {record['median']:8.3f}s"
+          + (f"  peak {record['peak_mb']:8.1f}MB" if track_memory else ''))
+    return record, result
+
+
+def _reset_store():
+    shutil.rmtree(daycall_store.STORE_DIR, ignore_errors=True)
+    mall_daycall.load_store_data.clear()
+
+
+def bench_daycall(root, n_rows, repeat, track_memory):
+    records = []
+    df = synthetic_data.daycall(n_rows)
+    params = {'rows': len(df), 'malls': int(df['쇼핑몰명'].nunique()), 'days': int(df['날짜'].nunique())}
+    csv_path = os.path.join(root, f'pusan_mall_{n_rows}.csv')
+    synthetic_data.write_daycall_csv(df, csv_path)
+    del df
+
+    # 콜드: 저장소가 비어 있는 상태에서 CSV 파싱 + 파티션 쓰기 + 조회
+    record, df_daycall = measure('daycall.load_and_prepare (cold)', lambda: mall_daycall.load_and_prepare_data(csv_path),
+                                 repeat=repeat, setup=_reset_store, track_memory=track_memory, **params)
+    records.append(record)
+    # 웜: 이미 반영된 파일은 stat 한 번으로 건너뛰고 저장소만 읽음
+    record, _ = measure('daycall.load_and_prepare (warm)',
+                        lambda: (mall_daycall.load_store_data.clear(), mall_daycall.load_and_prepare_data(csv_path)),
+                        repeat=repeat, track_memory=track_memory, **params)
+    records.append(record)
+
+    record, rollups = measure('daycall.build_rollups', lambda: daycall_rollup.build_rollups(df_daycall),
+                              repeat=repeat, track_memory=track_memory, **params)
+    records.append(record)
+
+    def reset_rollups():
+        shutil.rmtree(daycall_rollup.ROLLUP_DIR, ignore_errors=True)
+
+    record, _ = measure('daycall.rollup_sync (cold)', daycall_rollup.sync, repeat=repeat, setup=reset_rollups, **params)
+    records.append(record)
+
+    # 화면에서 팀/업체를 선택했을 때의 조회 (display_team_data/display_mall_data와 같은 필터)
+    teams = list(rollups['monthly']['팀명'].unique()[:3])
+    malls = list(rollups['monthly']['쇼핑몰명'].unique()[:20])
+
+    # 집계 큐브 파일에 조건을 넘겨 조회 (색인을 만들 때와 색인 구간 밖 일자를 조회할 때의 경로)
+    def query_team_mall():
+        daycall_query.select('팀명', teams, 'monthly')
+        daycall_query.select_recent('팀명', teams, days=10)
+        daycall_query.select('쇼핑몰명', malls, 'monthly')
+        daycall_query.select_recent('쇼핑몰명', malls, days=90)
+
+    record, _ = measure('daycall.query_team_mall', query_team_mall, repeat=repeat, track_memory=track_memory,
+                        **params, selected_teams=len(teams), selected_malls=len(malls))
+    records.append(record)
+    # 데이터 버전당 한 번 만드는 행 위치 색인과, 색인을 이용한 선택 (선택된 행 수에 비례)
+    record, indexes = measure('daycall.build_indexes', lambda: (daycall_index.build_indexes('팀명'), daycall_index.build_indexes('쇼핑몰명')),
+                              repeat=repeat, **params)
+    records.append(record)
+
+    def index_team_mall():
+        daycall_index.select(indexes[0], teams)
+        daycall_index.select_recent(indexes[0], teams, days=10)
+        daycall_index.select(indexes[1], malls)
+        daycall_index.select_recent(indexes[1], malls, days=90)
+
+    record, _ = measure('daycall.index_team_mall', index_team_mall, repeat=repeat, **params, selected_teams=len(teams), selected_malls=len(malls))
+    records.append(record)
+    record, _ = measure('daycall.query_totals', daycall_query.totals, repeat=repeat, track_memory=track_memory, **params)
+    records.append(record)
+    return records
+
+
+def bench_profit(root, n_years, n_services, repeat, track_memory):
+    services = [f'서비스{i:03d}' for i in range(n_services)]
+    raw = synthetic_data.profit(n_years, services)
+    params = {'years': n_years, 'services': n_services}
+    workbook_path = os.path.join(root, f'profit_month_{n_years}_{n_services}.xlsx')
+    raw.to_excel(workbook_path, index=False)
+
+    records = []
+    record, profit_df = measure('profit.prepare', lambda: profit_store.prepare_profit(raw.copy()), repeat=repeat, **params)
+    records.append(record)
+    record, _ = measure('profit.convert_workbook (cold)', lambda: profit_store.convert_workbook(workbook_path, f'bench{n_years}x{n_services}'),
+                        repeat=1, setup=lambda: [os.remove(p) for p in _profit_parquets()], **params)
+    records.append(record)
+    record, _ = measure('profit.build_kpi_tables', lambda: profit_kpi.build_kpi_tables(profit_df),
+                        repeat=repeat, track_memory=track_memory, **params)
+    records.append(record)
+    return records
+
+
+def _profit_parquets():
+    if not os.path.isdir(profit_store.STORE_DIR):
+        return []
+    return [os.path.join(profit_store.STORE_DIR, name) for name in os.listdir(profit_store.STORE_DIR)]
+
+
+def bench_forecast(n_months, repeat):
+    df = synthetic_data.month_call(n_months)
+    df_log = np.log(df.set_index(pd.to_datetime(df['ds']))[['y']].asfreq('MS'))
+    params = {'months': n_months}
+    order, seasonal_order = model_selection.DEFAULT_ORDER, model_selection.DEFAULT_SEASONAL_ORDER
+
+    records = []
+    record, _ = measure('forecast.fit_sarimax', lambda: model_selection.fit_sarimax(df_log, order, seasonal_order),
+                        repeat=repeat, **params)
+    records.append(record)
+
+    # fit_model과 같은 경로: 디스크 캐시 적중, 관측치 추가 시 증분 갱신
+    def fit_cached(series):
+        return model_cache.get_or_fit(series, model_selection.fit_sarimax, update=model_selection.update_sarimax,
+                                      order=order, seasonal_order=seasonal_order)
+
+    fit_cached(df_log.iloc[:-1])
+    record, _ = measure('forecast.fit_model (cache hit)', lambda: fit_cached(df_log.iloc[:-1]), repeat=repeat, **params)
+    records.append(record)
+    record, fit_result = measure('forecast.fit_model (append)', lambda: fit_cached(df_log), repeat=1, **params)
+    records.append(record)
+
+    # 시나리오 경로 생성 (수요예측 탭의 분위수/필요 인원 계산 입력)
+    record, _ = measure('forecast.simulate_paths', lambda: call_scenario.simulate_paths(fit_result), repeat=repeat,
+                        paths=call_scenario.N_PATHS, horizon=call_scenario.HORIZON, **params)
+    records.append(record)
+    return records
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=base_path, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def run(daycall_rows, profit_sizes, forecast_months, repeat=3, track_memory=False):
+    with tempfile.TemporaryDirectory(prefix='siic_bench_') as root:
+        synthetic_data.use_data_dir(root)
+        results = []
+        for n_rows in daycall_rows:
+            results += bench_daycall(root, n_rows, repeat, track_memory)
+        for n_years, n_services in profit_sizes:
+            results += bench_profit(root, n_years, n_services, repeat, track_memory)
+        for n_months in forecast_months:
+            results += bench_forecast(n_months, repeat)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, previous_path):
+    # 같은 (이름, 파라미터) 측정끼리 min 소요시간 비율 (1보다 크면 느려짐)
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {(r['name'], json.dumps(r['params'], sort_keys=True)): r for r in json.load(f)['results']}
+    print(f'\nvs {previous_path}')
+    for record in current['results']:
+        old = previous.get((record['name'], json.dumps(record['params'], sort_keys=True)))
+        if old is not None and old['min'] > 0:
+            print(f"{record['name']:<32} {json.dumps(record['params'], ensure_ascii=False):<40} x{record['min'] / old['min']:.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='합성 데이터 기반 성능 측정')
+    parser.add_argument('--daycall-rows', type=int, nargs='*', default=[100_000, 1_000_000], help='일별 콜 행 수 (예: 10000000)')
+    parser.add_argument('--profit', nargs='*', default=['3x5', '10x200'], help='연도수x서비스수')
+    parser.add_argument('--forecast-months', type=int, nargs='*', default=[54, 120])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--memory', action='store_true', help='tracemalloc으로 최대 메모리도 측정 (측정 1회 추가)')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    args = parser.parse_args()
+
+    profit_sizes = [tuple(int(v) for v in size.split('x')) for size in args.profit]
+    report = run(args.daycall_rows, profit_sizes, args.forecast_months, repeat=args.repeat, track_memory=args.memory)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    if args.compare:
+        compare(report, args.compare)
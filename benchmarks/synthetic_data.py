@@ -0,0 +1,107 @@
+# benchmarks/synthetic_data.py
+import os
+
+import numpy as np
+import pandas as pd
+
+TEAMS = ['운영지원팀', '전담상담팀', '통합상담 1팀', '통합상담 2팀', '통합상담 3(INC)팀', '통합상담 4팀', '통합상담 5팀']
+SERVICES = ['통합상담', 'INC', '스마트팀', '전담상담', '카페24']
+
+
+def daycall(n_rows, n_malls=None, end_date='2024-07-22', seed=0):
+    # mall_daycall 스키마(pusan_mall_*.csv)와 같은 형태. 업체마다 팀 하나, 영업일 x 업체 = 행
+    rng = np.random.default_rng(seed)
+    n_malls = n_malls or max(100, min(5000, n_rows // 120))
+    n_days = max(1, n_rows // n_malls)
+    days = pd.bdate_range(end=end_date, periods=n_days)[::-1]
+    malls = np.array([f'업체{i:05d}' for i in range(n_malls)])
+    mall_team = rng.integers(0, len(TEAMS), n_malls)
+    mall_scale = rng.gamma(0.6, 40, n_malls)
+
+    weekday_factor = np.array([1.3, 1.05, 1.0, 0.95, 0.9])[days.weekday.to_numpy()]
+    expected = mall_scale[None, :] * weekday_factor[:, None]
+    inbound = rng.poisson(expected).ravel()
+    outbound = rng.poisson(expected * 0.03).ravel()
+    inbound_customers = np.minimum(inbound, rng.poisson(expected * 0.9).ravel())
+    return pd.DataFrame({
+        '날짜': np.repeat(days.strftime('%Y-%m-%d'), n_malls),
+        '쇼핑몰명': np.tile(malls, n_days),
+        '팀명': np.tile(np.array(TEAMS)[mall_team], n_days),
+        '응대호': inbound,
+        '발신호': outbound,
+        '총처리호': inbound + outbound,
+        '전화문의고객수': inbound_customers,
+        '통화고객수': inbound_customers,
+    })
+
+
+def write_daycall_csv(df, path):
+    # 원본과 같이 BOM 포함 utf-8
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def month_call(n_months, end='2024-06-01', seed=0):
+    rng = np.random.default_rng(seed)
+    ds = pd.date_range(end=end, periods=n_months, freq='MS')
+    season = 1 + 0.12 * np.sin(2 * np.pi * ds.month.to_numpy() / 12)
+    y = (80000 * season * np.exp(np.cumsum(rng.normal(0, 0.03, n_months)))).astype(int)
+    return pd.DataFrame({'id': np.arange(1, n_months + 1), 'ds': ds.strftime('%Y-%m-%d'), 'y': y,
+                         'created_at': '2024-07-17 16:40:21'})
+
+
+def profit(n_years, services=SERVICES, end='2024-06-01', seed=0):
+    # profit_month.xlsx와 같은 형태 (날짜, 매출:*, 매출:지원금, 지출:*)
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=end, periods=n_years * 12, freq='MS')
+    columns = {'날짜': dates}
+    for service in services:
+        columns[f'매출:{service}'] = rng.integers(0, 200_000_000, len(dates))
+    columns['매출:지원금'] = rng.integers(0, 20_000_000, len(dates))
+    for service in services:
+        columns[f'지출:{service}'] = rng.integers(0, 200_000_000, len(dates))
+    return pd.DataFrame(columns)
+
+
+def write_data_tree(root, daycall_rows, n_months=54, profit_years=3, end_date='2024-07-22'):
+    # data/ 폴더와 같은 구성(mall_daycall, month_call_total, profit_month)으로 원본 파일을 생성
+    daycall_dir = os.path.join(root, 'mall_daycall')
+    month_call_dir = os.path.join(root, 'month_call_total')
+    profit_dir = os.path.join(root, 'profit_month')
+    for folder in (daycall_dir, month_call_dir, profit_dir):
+        os.makedirs(folder, exist_ok=True)
+    write_daycall_csv(daycall(daycall_rows, end_date=end_date), os.path.join(daycall_dir, f'pusan_mall_{end_date}.csv'))
+    month_end = pd.Timestamp(end_date).to_period('M').to_timestamp()
+    month_call(n_months, end=month_end.strftime('%Y-%m-%d')).to_csv(
+        os.path.join(month_call_dir, f"month_call_{month_end.strftime('%Y-%m')}.csv"), index=False)
+    profit(profit_years).to_excel(os.path.join(profit_dir, 'profit_month.xlsx'), index=False)
+
+
+def use_data_dir(root):
+    # 실제 data/ 폴더를 건드리지 않도록 원본 위치와 저장소/캐시 위치를 모두 임시 폴더로 변경
+    import batch_forecast
+    import data_catalog
+    import data_export
+    import daycall_rollup
+    import daycall_store
+    import model_cache
+    import model_selection
+    import profit_store
+    import report_builder
+    import result_cache
+
+    data_catalog.DATA_DIR = root
+    data_catalog.CATALOG_PATH = os.path.join(root, '_catalog.json')
+    daycall_store.STORE_DIR = os.path.join(root, 'mall_daycall_store')
+    daycall_store.MANIFEST_PATH = os.path.join(daycall_store.STORE_DIR, '_manifest.json')
+    daycall_rollup.ROLLUP_DIR = os.path.join(daycall_store.STORE_DIR, '_rollup')
+    daycall_rollup.APPLIED_PATH = os.path.join(daycall_rollup.ROLLUP_DIR, '_applied.json')
+    model_cache.MODEL_CACHE_DIR = os.path.join(root, 'model_cache')
+    model_selection.SELECTION_DIR = os.path.join(root, 'model_selection')
+    batch_forecast.FORECAST_DIR = os.path.join(root, 'forecast_store')
+    batch_forecast.FORECAST_PATH = os.path.join(batch_forecast.FORECAST_DIR, 'daycall_forecast.parquet')
+    profit_store.STORE_DIR = os.path.join(root, 'profit_store')
+    report_builder.REPORT_DIRS = {kind: os.path.join(root, 'report', f'siic_{kind}') for kind in report_builder.REPORT_DIRS}
+    report_builder.REPORT_MANIFEST_PATH = os.path.join(root, 'report', '_generated.json')
+    result_cache.CACHE_DIR = os.path.join(root, 'result_cache')
+    result_cache.CACHE_PATH = os.path.join(result_cache.CACHE_DIR, 'results.sqlite')
+    data_export.EXPORT_DIR = os.path.join(root, 'export')
@@ -0,0 +1,132 @@
+# call_scenario.py
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import daycall_query
+import daycall_store
+
+# 학습된 월별 SARIMAX(로그 척도) 상태공간 모형에서 미래 콜 처리량 경로를 한 번에 대량으로 생성하고,
+# 일별 콜의 요일 분포로 나눠 요일별 필요 인원의 분위수를 계산 (시나리오/기간을 바꿔도 재학습·재생성하지 않음)
+N_PATHS = 5000
+HORIZON = 24
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9, 0.95]
+# 요일 분포를 계산할 최근 기간
+PROFILE_WEEKS = 12
+
+
+def _normal(rng, cov, size):
+    # 공분산이 특이(차분 상태, 관측오차 0)해도 되도록 고유값 분해로 표준정규 난수를 변환
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    return rng.standard_normal((*size, len(eigenvalues))) @ (eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))).T
+
+
+def _time_invariant(matrix):
+    if matrix.shape[-1] != 1:
+        raise ValueError('time-varying state space models are not supported')
+    return matrix[..., 0]
+
+
+def simulate_paths(fit_result, horizon=HORIZON, n_paths=N_PATHS, seed=0):
+    # 마지막 관측 다음 시점의 예측 상태 분포에서 경로별 시작 상태를 뽑고, 시점마다 모든 경로를 행렬 연산 한 번으로 전개
+    # (statsmodels simulate(repetitions=...)는 경로마다 반복하므로 수천 개 경로에서는 느림). 반환: (n_paths, horizon) 로그 값
+    results = fit_result.filter_results
+    design, transition, selection = (_time_invariant(m) for m in (results.design, results.transition, results.selection))
+    obs_cov, state_cov = _time_invariant(results.obs_cov), _time_invariant(results.state_cov)
+    obs_intercept, state_intercept = _time_invariant(results.obs_intercept), _time_invariant(results.state_intercept)
+
+    rng = np.random.default_rng(seed)
+    state = results.predicted_state[:, -1] + _normal(rng, results.predicted_state_cov[:, :, -1], (n_paths,))
+    state_shocks = _normal(rng, state_cov, (horizon, n_paths)) @ selection.T
+    obs_shocks = _normal(rng, obs_cov, (horizon, n_paths))
+    paths = np.empty((n_paths, horizon))
+    for t in range(horizon):
+        paths[:, t] = (state @ design.T + obs_intercept + obs_shocks[t])[:, 0]
+        state = state @ transition.T + state_intercept + state_shocks[t]
+    return paths
+
+
+def path_months(last_month, horizon=HORIZON):
+    return pd.date_range(pd.Timestamp(last_month) + pd.offsets.MonthBegin(1), periods=horizon, freq='MS')
+
+
+def weekday_profile(weeks=PROFILE_WEEKS):
+    # 최근 weeks주 일별 전체 콜의 요일별 하루 평균 (영업일 평균 대비 비율). 일별 데이터가 없으면 균등
+    uniform = pd.Series(1.0, index=daycall_store.weekday_order)
+    end = daycall_query.last_day()
+    if end is None:
+        return uniform
+    start = end - pd.Timedelta(weeks=weeks)
+    rows = daycall_query.daily_rows(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), columns=('날짜', '요일', '총처리호'))
+    daily = rows.groupby(['날짜', '요일'], observed=True)['총처리호'].sum().reset_index()
+    profile = daily.groupby('요일')['총처리호'].mean().reindex(daycall_store.weekday_order).fillna(0)
+    if profile.sum() <= 0:
+        return uniform
+    return profile / profile[profile > 0].mean()
+
+
+def daily_shares(months, profile):
+    # 월 총량 중 요일별 하루 몫: 그 달의 요일별 영업일 수와 요일 비율로 배분 (월 x 요일, 행 합계 x 영업일 수 = 1)
+    weights = profile.to_numpy(dtype=float)
+    shares = np.zeros((len(months), len(weights)))
+    for i, month in enumerate(months):
+        days = pd.bdate_range(month, month + pd.offsets.MonthEnd(0))
+        counts = np.bincount(days.weekday, minlength=7)[:len(weights)]
+        shares[i] = weights / (weights @ counts)
+    return pd.DataFrame(shares, index=months, columns=profile.index)
+
+
+def daily_calls(paths, shares):
+    # 경로별 월 총량 -> 경로별 요일별 하루 처리호 (n_paths, 월, 요일)
+    return paths[:, :, None] * shares.to_numpy()[None, :, :]
+
+
+def quantile_table(values, index, quantiles=QUANTILES):
+    # values: (n_paths, len(index)) -> index x 분위수 표
+    return pd.DataFrame(np.quantile(values, quantiles, axis=0).T, index=index, columns=[f'P{round(q * 100)}' for q in quantiles])
+
+
+def staffing(calls, weekdays, calls_per_agent, quantile, current_staff=None):
+    # 요일별 하루 처리호 분포(n_paths, 요일) -> 분위수 기준 필요 인원과 현재 인원으로 처리 가능한 확률
+    required = calls / calls_per_agent
+    table = pd.DataFrame(index=pd.Index(weekdays, name='요일'), data={
+        '하루 처리호 (중앙값)': np.median(calls, axis=0),
+        f'하루 처리호 (P{round(quantile * 100)})': np.quantile(calls, quantile, axis=0),
+        f'필요 인원 (P{round(quantile * 100)})': np.ceil(np.quantile(required, quantile, axis=0)).astype(int),
+    })
+    if current_staff:
+        table['현재 인원 충분 확률(%)'] = (required <= current_staff).mean(axis=0) * 100
+    return table
+
+
+if __name__ == '__main__':
+    import data_catalog
+    import model_cache
+    import model_selection
+
+    parser = argparse.ArgumentParser(description='월별 콜 처리량 시나리오 및 요일별 필요 인원')
+    parser.add_argument('--month', help='YYYY-MM (생략 시 다음 달)')
+    parser.add_argument('--calls-per-agent', type=float, default=100.0, help='상담사 1인당 하루 처리호')
+    parser.add_argument('--quantile', type=float, default=0.9)
+    parser.add_argument('--staff', type=int, default=None, help='현재 인원')
+    parser.add_argument('--paths', type=int, default=N_PATHS)
+    args = parser.parse_args()
+
+    df_log = model_selection.load_month_call_log(data_catalog.latest_valid('month_call_total')['path'])
+    selection = model_selection.load_selection(df_log)
+    order, seasonal_order = ((selection['best']['order'], selection['best']['seasonal_order']) if selection
+                             else (model_selection.DEFAULT_ORDER, model_selection.DEFAULT_SEASONAL_ORDER))
+    fit_result = model_cache.get_or_fit(df_log, model_selection.fit_sarimax, update=model_selection.update_sarimax,
+                                        order=order, seasonal_order=seasonal_order)
+    months = path_months(df_log.index[-1])
+    paths = np.exp(simulate_paths(fit_result, n_paths=args.paths))
+    print(quantile_table(paths, months.strftime('%Y-%m')).round(0).to_string())
+
+    month = pd.Timestamp(args.month) if args.month else months[0]
+    position = months.get_loc(month)
+    shares = daily_shares(months, weekday_profile())
+    calls = daily_calls(paths, shares)[:, position, :]
+    table = staffing(calls, shares.columns, args.calls_per_agent, args.quantile, args.staff)
+    print(f"\n{month:%Y-%m} 요일별 필요 인원 (1인당 하루 {args.calls_per_agent:g}호)")
+    print(table.round(2).to_string())
@@ -0,0 +1,64 @@
+# call_schema.py
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# 파일별 선언 스키마: 이름은 categorical, 건수는 int32, 날짜는 읽는 시점에 파싱
+DAYCALL_SCHEMA = {
+    'columns': ['날짜', '쇼핑몰명', '팀명', '응대호', '발신호', '총처리호', '전화문의고객수', '통화고객수'],
+    'dtype': {'쇼핑몰명': 'str', '팀명': 'str', '응대호': 'int32', '발신호': 'int32', '총처리호': 'int32',
+              '전화문의고객수': 'int32', '통화고객수': 'int32'},
+    'categorical': ['쇼핑몰명', '팀명'],
+    'parse_dates': ['날짜'],
+    'date_format': '%Y-%m-%d',
+}
+
+MONTH_CALL_SCHEMA = {
+    'columns': ['id', 'ds', 'y', 'created_at'],
+    'dtype': {'id': 'int32', 'y': 'int32'},
+    'categorical': [],
+    'parse_dates': ['ds', 'created_at'],
+    'date_format': {'ds': '%Y-%m-%d', 'created_at': '%Y-%m-%d %H:%M:%S'},
+}
+
+
+def _inferred_bytes_per_row(file_path, schema, nrows):
+    # 스키마 없이(pandas 기본 추론: int64/object 문자열) 읽었을 때의 행당 메모리 (앞부분 표본으로 측정)
+    sample = pd.read_csv(file_path, encoding='utf-8-sig', usecols=schema['columns'], nrows=nrows)
+    return sample.memory_usage(deep=True).sum() / len(sample) if len(sample) else 0
+
+
+def read_typed_csv(file_path, schema, row_filter=None, chunksize=100_000):
+    # 청크 단위로 읽으면서 필터와 categorical 변환을 적용하고, 메모리 비교 값을 함께 반환
+    #  memory_inferred: 스키마 없이 전체 행을 읽었다면 쓸 메모리 (표본 행당 메모리 x 읽은 행 수, 추정치)
+    #  memory_after: 필터와 변환을 마친 결과의 실제 메모리
+    memory = {'rows_read': 0, 'rows_kept': 0, 'memory_inferred': 0, 'memory_after': 0}
+    chunks = []
+    reader = pd.read_csv(file_path, encoding='utf-8-sig', usecols=schema['columns'], dtype=schema['dtype'],
+                         parse_dates=schema['parse_dates'], date_format=schema['date_format'], chunksize=chunksize)
+    for chunk in reader:
+        memory['rows_read'] += len(chunk)
+        if row_filter is not None:
+            chunk = chunk[row_filter(chunk)]
+        chunks.append(chunk.astype({col: 'category' for col in schema['categorical']}))
+
+    memory['memory_inferred'] = int(_inferred_bytes_per_row(file_path, schema, min(chunksize, 10_000)) * memory['rows_read'])
+    if not chunks:
+        return pd.DataFrame(columns=schema['columns']), memory
+
+    # 청크마다 다른 카테고리를 합집합으로 맞춰야 concat 후에도 categorical이 유지됨
+    for col in schema['categorical']:
+        categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    df = pd.concat(chunks, ignore_index=True)
+    memory['rows_kept'] = len(df)
+    memory['memory_after'] = int(df.memory_usage(deep=True).sum())
+    return df, memory
+
+
+def read_daycall_csv(file_path, chunksize=100_000):
+    return read_typed_csv(file_path, DAYCALL_SCHEMA, row_filter=lambda chunk: chunk['총처리호'] != 0, chunksize=chunksize)
+
+
+def read_month_call_csv(file_path):
+    return read_typed_csv(file_path, MONTH_CALL_SCHEMA)
@@ -0,0 +1,119 @@
+# chart_render.py
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# 브라우저로 보내는 차트 데이터 크기를 이력 길이/업체 수와 관계없이 제한
+#  - 긴 일별 시계열은 서버에서 점 수를 줄임 (선/영역: LTTB, 막대: 구간별 최소·최대)
+#  - 점이 많으면 SVG 대신 WebGL trace로 그림 (누적 영역형은 누적값을 미리 계산한 WebGL 채움 선)
+# 그림 하나(trace 전체)에 보내는 최대 점 수
+MAX_POINTS = 4000
+# 이보다 점이 많으면 WebGL
+WEBGL_POINTS = 1000
+
+
+def _numeric(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    # 문자열 축(월 등)은 순서대로 등간격
+    return np.arange(len(values), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: 처음/마지막 점은 두고, 구간마다 직전 선택점과 다음 구간 평균으로 만든
+    # 삼각형의 넓이가 가장 큰 점을 선택 (급증/급감 같은 모양을 유지하면서 점 수를 n_out개로)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_out):
+    # 구간마다 최솟값/최댓값 위치만 남김 (막대처럼 개별 값의 최고/최저가 보여야 할 때)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, max(1, n_out // 2) + 1).astype(int)
+    picks = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            picks += [start + int(np.argmin(y[start:end])), start + int(np.argmax(y[start:end]))]
+    return np.unique(picks)
+
+
+def _pick(x_values, y_values, n_out, method):
+    y_values = np.nan_to_num(np.asarray(y_values, dtype=float))
+    if method == 'minmax':
+        return minmax_indices(y_values, n_out)
+    return lttb_indices(_numeric(x_values), y_values, n_out)
+
+
+def downsample(df, x, y, color=None, max_points=MAX_POINTS, method='lttb', shared_x=False):
+    # 전체 점 수가 max_points를 넘을 때만 줄임 (None이면 줄이지 않음). shared_x=True(누적 막대/영역)는
+    # 모든 계열에서 같은 x만 남겨 누적이 어긋나지 않도록 하고, 아니면 계열(color)마다 따로 고름
+    if max_points is None or len(df) <= max_points:
+        return df
+    n_groups = df[color].nunique() if color else 1
+    n_out = max(3, max_points // max(n_groups, 1))
+    if color is None or shared_x:
+        total = df.groupby(x, sort=True, observed=True)[y].sum()
+        keep = total.index[_pick(total.index, total.to_numpy(), n_out, method)]
+        return df[df[x].isin(keep)]
+    parts = []
+    for _, group in df.groupby(color, sort=False, observed=True):
+        group = group.sort_values(x)
+        parts.append(group.iloc[_pick(group[x], group[y], n_out, method)])
+    return pd.concat(parts)
+
+
+def render_mode(n_points):
+    return 'webgl' if n_points > WEBGL_POINTS else 'svg'
+
+
+def line(df, x, y, color=None, max_points=MAX_POINTS, **kwargs):
+    df = downsample(df, x, y, color, max_points)
+    return px.line(df, x=x, y=y, color=color, render_mode=render_mode(len(df)), **kwargs)
+
+
+def scatter(df, x, y, **kwargs):
+    return px.scatter(df, x=x, y=y, render_mode=render_mode(len(df)), **kwargs)
+
+
+def bar(df, x, y, color=None, max_points=MAX_POINTS, **kwargs):
+    df = downsample(df, x, y, color, max_points, method='minmax', shared_x=True)
+    return px.bar(df, x=x, y=y, color=color, **kwargs)
+
+
+def area(df, x, y, color, max_points=MAX_POINTS, title=None):
+    df = downsample(df, x, y, color, max_points, shared_x=True)
+    if len(df) <= WEBGL_POINTS:
+        return px.area(df, x=x, y=y, color=color, title=title)
+
+    # WebGL(scattergl)은 stackgroup을 지원하지 않으므로 누적값을 미리 계산해 이전 계열까지 채움
+    # (마우스오버에는 누적값이 아니라 원래 값을 표시)
+    wide = df.pivot_table(index=x, columns=color, values=y, aggfunc='sum', observed=True).sort_index().fillna(0)
+    stacked = wide.cumsum(axis=1)
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, name in enumerate(wide.columns):
+        fig.add_trace(go.Scattergl(x=wide.index, y=stacked[name], customdata=wide[name], name=str(name), mode='lines',
+                                   fill='tozeroy' if i == 0 else 'tonexty', line=dict(color=colors[i % len(colors)], width=1),
+                                   hovertemplate=f'{color}={name}<br>{x}=%{{x}}<br>{y}=%{{customdata}}<extra></extra>'))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=color)
+    return fig
@@ -0,0 +1,192 @@
+# data_catalog.py
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import call_schema
+
+base_path = os.path.dirname(__file__)
+DATA_DIR = os.path.join(base_path, 'data')
+CATALOG_PATH = os.path.join(DATA_DIR, '_catalog.json')
+
+# 데이터셋별 폴더, 파일 패턴, 파일명에서 기간을 읽는 형식, 필수 컬럼
+DATASETS = {
+    'mall_daycall': {'folder': 'mall_daycall', 'pattern': 'pusan_mall_*.csv', 'period_format': '%Y-%m-%d',
+                     'columns': call_schema.DAYCALL_SCHEMA['columns']},
+    'month_call_total': {'folder': 'month_call_total', 'pattern': 'month_call_*.csv', 'period_format': '%Y-%m',
+                         'columns': call_schema.MONTH_CALL_SCHEMA['columns']},
+    'profit_month': {'folder': 'profit_month', 'pattern': 'profit_month*.xlsx', 'period_format': None,
+                     'columns': ['날짜']},
+    'month_report': {'folder': 'report/month', 'pattern': 'month_report_*.xlsx', 'period_format': '%Y-%m',
+                     'columns': []},
+}
+
+# 프로세스 내 캐시: 폴더 수정시각이 그대로면 디렉터리를 다시 훑지 않음
+_catalog = None
+_folder_versions = {}
+# 세션(스레드)들이 같은 임시 파일에 catalog를 동시에 쓰지 않도록 색인 갱신은 한 번에 하나만
+_refresh_lock = threading.Lock()
+
+
+def _period(file_name, period_format):
+    if period_format is None:
+        return None
+    date_str = os.path.splitext(file_name)[0].split('_')[-1]
+    try:
+        return datetime.strptime(date_str, period_format).strftime(period_format)
+    except ValueError:
+        return None
+
+
+def _inspect_csv(path, columns):
+    # 한 번 읽으면서 checksum과 행 수를 함께 계산하고, 헤더가 스키마와 맞는지 확인
+    digest = hashlib.sha256()
+    lines = 0
+    last_byte = b'\n'
+    with open(path, 'rb') as f:
+        header = f.readline()
+        digest.update(header)
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+            lines += block.count(b'\n')
+            last_byte = block[-1:]
+    rows = lines + (last_byte != b'\n')
+    header_columns = header.decode('utf-8-sig', errors='replace').strip().split(',')
+    missing = [col for col in columns if col not in header_columns]
+    error = f'missing columns: {missing}' if missing else (None if rows else 'no rows')
+    return digest.hexdigest(), rows, error
+
+
+def _inspect_xlsx(path, columns):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    # openpyxl은 새 워크북을 색인할 때만 필요하므로 앱 시작 시 import하지 않음
+    import openpyxl
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        sheet = workbook.worksheets[0]
+        header_columns = [cell.value for cell in next(sheet.iter_rows(max_row=1))]
+        rows = sheet.max_row - 1
+        workbook.close()
+    except Exception as e:
+        return digest.hexdigest(), 0, f'unreadable workbook: {e}'
+    missing = [col for col in columns if col not in header_columns]
+    error = f'missing columns: {missing}' if missing else (None if rows > 0 else 'no rows')
+    return digest.hexdigest(), rows, error
+
+
+def _inspect(path, spec, file_name):
+    stat = os.stat(path)
+    inspect = _inspect_xlsx if file_name.endswith('.xlsx') else _inspect_csv
+    checksum, rows, error = inspect(path, spec['columns'])
+    period = _period(file_name, spec['period_format'])
+    if spec['period_format'] is not None and period is None:
+        error = error or 'no period in file name'
+    return {'file': os.path.relpath(path, base_path), 'period': period, 'rows': rows, 'checksum': checksum,
+            'size': stat.st_size, 'mtime': stat.st_mtime, 'valid': error is None, 'error': error}
+
+
+def _read_catalog():
+    try:
+        with open(CATALOG_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_catalog(catalog):
+    tmp_path = f'{CATALOG_PATH}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, CATALOG_PATH)
+
+
+def refresh(dataset=None):
+    with _refresh_lock:
+        return _refresh(dataset)
+
+
+def _refresh(dataset=None):
+    # 변경된(크기/수정시각) 파일만 다시 검사하고, 데이터셋별 최신 유효 스냅샷을 미리 계산해 둠
+    global _catalog
+    catalog = _read_catalog()
+    changed = False
+    for name, spec in DATASETS.items():
+        if dataset is not None and name != dataset:
+            continue
+        folder = os.path.join(DATA_DIR, spec['folder'])
+        entry = catalog.get(name, {'files': {}, 'latest': None})
+        files = {}
+        file_names = fnmatch.filter(os.listdir(folder), spec['pattern']) if os.path.isdir(folder) else []
+        for file_name in file_names:
+            path = os.path.join(folder, file_name)
+            previous = entry['files'].get(file_name)
+            stat = os.stat(path)
+            if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime:
+                files[file_name] = previous
+            else:
+                files[file_name] = _inspect(path, spec, file_name)
+                changed = True
+        if set(files) != set(entry['files']):
+            changed = True
+        valid = sorted((f for f in files.values() if f['valid']), key=lambda f: (f['period'] or '', f['mtime']))
+        catalog[name] = {'files': files, 'latest': valid[-1]['file'] if valid else None}
+        _folder_versions[name] = os.stat(folder).st_mtime_ns if os.path.isdir(folder) else None
+    if changed:
+        _write_catalog(catalog)
+    _catalog = catalog
+    return catalog
+
+
+def _files_changed(entry):
+    # 제자리 덮어쓰기(폴더 수정시각은 그대로)도 알 수 있도록 색인된 파일마다 크기/수정시각을 확인 (stat만, 파일은 읽지 않음)
+    for file_entry in entry['files'].values():
+        try:
+            stat = os.stat(os.path.join(base_path, file_entry['file']))
+        except FileNotFoundError:
+            return True
+        if stat.st_size != file_entry['size'] or stat.st_mtime != file_entry['mtime']:
+            return True
+    return False
+
+
+def _dataset(dataset):
+    # 폴더 수정시각(파일 추가/삭제 시 바뀜)과 파일별 크기/수정시각이 바뀌었을 때만 다시 색인 (바뀐 파일만 다시 검사)
+    folder = os.path.join(DATA_DIR, DATASETS[dataset]['folder'])
+    version = os.stat(folder).st_mtime_ns if os.path.isdir(folder) else None
+    if (_catalog is None or dataset not in _catalog or _folder_versions.get(dataset) != version
+            or _files_changed(_catalog[dataset])):
+        refresh(dataset)
+    return _catalog[dataset]
+
+
+def _with_path(file_entry):
+    return {**file_entry, 'path': os.path.join(base_path, file_entry['file'])}
+
+
+def latest_valid(dataset):
+    entry = _dataset(dataset)
+    if entry['latest'] is None:
+        return None
+    return _with_path(entry['files'][os.path.basename(entry['latest'])])
+
+
+def date_range(dataset, start=None, end=None, valid_only=True):
+    files = _dataset(dataset)['files'].values()
+    selected = [f for f in files
+                if (not valid_only or f['valid'])
+                and (start is None or (f['period'] or '') >= str(start))
+                and (end is None or (f['period'] or '') <= str(end))]
+    return [_with_path(f) for f in sorted(selected, key=lambda f: (f['period'] or '', f['mtime']))]
+
+
+if __name__ == '__main__':
+    for name, entry in refresh().items():
+        print(f"[{name}] latest valid: {entry['latest']}")
+        for file_name, f in sorted(entry['files'].items()):
+            print(f"  {file_name}: period={f['period']} rows={f['rows']} valid={f['valid']}" + (f" ({f['error']})" if f['error'] else ''))
@@ -0,0 +1,159 @@
+# data_export.py
+import argparse
+import os
+import shlex
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+import data_catalog
+import daycall_query
+import daycall_store
+import profit_store
+import report_builder
+
+# raw data 내보내기: 결과를 청크(일자 파티션/집계 파일 단위) 단위로 받아 바로 파일에 흘려 쓰므로
+# 내보내는 동안 메모리는 선택 크기가 아니라 청크 하나 크기로 제한됨
+base_path = os.path.dirname(__file__)
+EXPORT_DIR = os.path.join(base_path, 'data', 'export')
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+CHUNK_ROWS = 100_000
+# 화면(다운로드 버튼) 내보내기 최대 행 수: Streamlit은 파일 객체나 콜백 결과도 전부 bytes로 읽어 서버 메모리에 올린 뒤
+# 보내므로 스트리밍할 수 없음 -> 이보다 큰 내보내기는 서버에서 CLI로 파일에 직접 쓰도록 안내
+MAX_EXPORT_ROWS = 500_000
+
+
+def frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def daycall_chunks(start_date=None, end_date=None, teams=None, malls=None):
+    # 일별 원본 (daycall 저장소의 일자 파티션)
+    return daycall_store.iter_days(start_date, end_date, teams=teams, malls=malls)
+
+
+def rollup_chunks(level, names, grain='daily', start=None, end=None):
+    # 팀/업체별 일자별·월별 합계 (증분 집계 큐브)
+    return daycall_query.iter_select(level, names, grain, start, end)
+
+
+def profit_chunks(workbook_path, checksum):
+    # 손익 원본 (워크북을 변환한 parquet)
+    return frame_chunks(profit_store.load_profit(workbook_path, checksum))
+
+
+def _write_csv(chunks, path):
+    # 원본 CSV와 같이 BOM 포함 utf-8 (엑셀에서 한글이 깨지지 않도록)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        header = True
+        for df in chunks:
+            df.to_csv(f, header=header, index=False, date_format='%Y-%m-%d')
+            header = False
+
+
+def _write_parquet(chunks, path):
+    writer = None
+    try:
+        for df in chunks:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({}), path)
+
+
+def write(chunks, fmt, path, sheet_name='data'):
+    # 임시 파일에 쓴 뒤 교체 (중간에 실패해도 반쯤 쓰인 파일이 남지 않도록)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown export format: {fmt}')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        if fmt == 'csv':
+            _write_csv(chunks, tmp_path)
+        elif fmt == 'parquet':
+            _write_parquet(chunks, tmp_path)
+        else:
+            report_builder.write_xlsx(tmp_path, {sheet_name: chunks})
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return path
+
+
+def _limit_rows(chunks, max_rows):
+    rows = 0
+    for df in chunks:
+        rows += len(df)
+        if rows > max_rows:
+            raise ValueError(f'내보낼 행이 화면 내보내기 한도({max_rows:,}행)를 넘습니다. python data_export.py로 내보내세요.')
+        yield df
+
+
+def _cli_command(cli):
+    return shlex.join(['python', 'data_export.py', *cli])
+
+
+def export_bytes(make_chunks, fmt, sheet_name='data', max_rows=MAX_EXPORT_ROWS):
+    # 다운로드 버튼용: 디스크에 청크 단위로 쓴 뒤 완성된 파일 내용만 반환하고 임시 파일은 삭제
+    # (행 수를 미리 알 수 없는 내보내기도 한도를 넘는 순간 중단)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f'.{fmt}', dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        write(_limit_rows(make_chunks(), max_rows), fmt, path, sheet_name=sheet_name)
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def export_controls(name, make_chunks, key, n_rows=None, cli=None):
+    # 형식 선택 + 다운로드 버튼. make_chunks는 클릭했을 때만 (별도 스레드에서) 실행됨
+    # n_rows(행 수 또는 상한)가 한도를 넘으면 버튼 대신 같은 결과를 파일로 쓰는 CLI 명령을 안내 (cli: view 이후 인자)
+    if n_rows is not None and n_rows > MAX_EXPORT_ROWS:
+        command = _cli_command(cli) if cli else 'python data_export.py'
+        st.warning(f'내보낼 데이터가 최대 {n_rows:,}행으로 화면 내보내기 한도({MAX_EXPORT_ROWS:,}행)를 넘습니다. '
+                   f'서버에서 다음 명령으로 내보내세요: `{command}`')
+        return
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox('내보내기 형식', list(FORMATS), key=f'{key}_format', label_visibility='collapsed')
+    with col2:
+        st.download_button(f'{fmt} 내보내기', lambda: export_bytes(make_chunks, fmt, sheet_name=name[:31]),
+                           file_name=f'{name}.{fmt}', mime=FORMATS[fmt], key=f'{key}_download', on_click='ignore')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='raw data 내보내기 (웹 화면을 거치지 않는 대용량 내보내기)')
+    parser.add_argument('view', choices=['daycall', 'team', 'mall', 'profit'])
+    parser.add_argument('output', help='저장 경로 (.csv / .parquet / .xlsx)')
+    parser.add_argument('--start', help='YYYY-MM-DD (월별은 YYYY-MM)')
+    parser.add_argument('--end')
+    parser.add_argument('--names', nargs='*', help='팀명/쇼핑몰명 (생략 시 전체)')
+    parser.add_argument('--monthly', action='store_true', help='team/mall을 월별 합계로')
+    args = parser.parse_args()
+
+    fmt = os.path.splitext(args.output)[1].lstrip('.')
+    if args.view == 'daycall':
+        chunks = daycall_chunks(args.start, args.end)
+    elif args.view == 'profit':
+        workbook = data_catalog.latest_valid('profit_month')
+        chunks = profit_chunks(workbook['path'], workbook['checksum'])
+    else:
+        level = '팀명' if args.view == 'team' else '쇼핑몰명'
+        chunks = rollup_chunks(level, args.names, 'monthly' if args.monthly else 'daily', args.start, args.end)
+    print(write(chunks, fmt, args.output, sheet_name=args.view))
@@ -0,0 +1,106 @@
+# daycall_anomaly.py
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import batch_forecast
+import daycall_query
+import daycall_store
+
+# 업체/부서 x 영업일 행렬에서 같은 요일의 직전 weeks주 값으로 기준선(평균)과 변동폭을 구하고
+# 기준선 대비 잔차의 z-score로 급증/급감 일자를 표시. 모든 시계열을 한 번에 계산 (업체별 반복 없음)
+WEEKS = 8
+MIN_WEEKS = 4
+THRESHOLD = 3.0
+MIN_DELTA = 20
+
+
+def load_window(days=60, weeks=WEEKS):
+    # 탐지 구간(최근 days 영업일) + 기준선 계산에 필요한 weeks주만 읽음
+    end = daycall_query.last_day()
+    if end is None:
+        return daycall_query.daily_rows()
+    start = end - pd.offsets.BDay(days + weeks * 5)
+    return daycall_query.daily_rows(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+
+
+def _seasonal_baseline(matrix, weeks, min_weeks):
+    # 영업일 격자에서 5칸 전은 같은 요일. 직전 weeks주의 같은 요일 값을 쌓아 평균/표준편차 계산 (휴일/결측은 NaN)
+    lagged = np.full((weeks, *matrix.shape), np.nan)
+    for week in range(1, weeks + 1):
+        lag = week * 5
+        lagged[week - 1, :, lag:] = matrix[:, :-lag] if lag < matrix.shape[1] else np.nan
+    count = np.sum(~np.isnan(lagged), axis=0)
+    baseline = np.nansum(lagged, axis=0) / np.maximum(count, 1)
+    deviation = np.sqrt(np.nansum((lagged - baseline) ** 2, axis=0) / np.maximum(count - 1, 1))
+    # 건수 데이터이므로 변동폭 하한은 포아송 표준편차(sqrt(기준선))와 1건
+    scale = np.maximum(deviation, np.maximum(np.sqrt(baseline), 1.0))
+    baseline[count < min_weeks] = np.nan
+    return baseline, scale
+
+
+def score(daily, value='총처리호', weeks=WEEKS, min_weeks=MIN_WEEKS):
+    # 업체(최하위 팀/업체 쌍)와 부서 단위로 기준선, 잔차, z-score 행렬을 계산
+    if daily.empty:
+        return None
+    keys, days, matrix = batch_forecast.build_matrix(daily, value=value)
+    # 전체 건수가 0인 영업일(휴일, 미수집일)은 평가/기준선에서 제외
+    matrix[:, matrix.sum(axis=0) == 0] = np.nan
+
+    team_codes, teams = pd.factorize(keys['팀명'].astype(str))
+    team_matrix = np.zeros((len(teams), matrix.shape[1]))
+    np.add.at(team_matrix, team_codes, np.nan_to_num(matrix))
+    team_matrix[:, np.isnan(matrix).all(axis=0)] = np.nan
+
+    scores = {'days': days}
+    for level, names, parents, values in [('쇼핑몰명', keys['쇼핑몰명'].astype(str).to_numpy(), keys['팀명'].astype(str).to_numpy(), matrix),
+                                          ('팀명', np.asarray(teams), np.asarray(teams), team_matrix)]:
+        baseline, scale = _seasonal_baseline(values, weeks, min_weeks)
+        residual = values - baseline
+        scores[level] = {'names': names, 'teams': parents, 'values': values, 'baseline': baseline,
+                         'residual': residual, 'z': residual / scale}
+    return scores
+
+
+def flagged(scores, level='쇼핑몰명', threshold=THRESHOLD, min_delta=MIN_DELTA, since=None):
+    # |z| >= threshold 이고 기준선과의 차이가 min_delta건 이상인 (대상, 일자)
+    columns = ['날짜', '요일', '팀명', level, '처리호', '기준선', '차이', 'z', '구분']
+    if scores is None:
+        return pd.DataFrame(columns=list(dict.fromkeys(columns)))
+    result = scores[level]
+    days = scores['days']
+    with np.errstate(invalid='ignore'):
+        mask = (np.abs(result['z']) >= threshold) & (np.abs(result['residual']) >= min_delta)
+    if since is not None:
+        mask[:, days < pd.Timestamp(since)] = False
+    rows, cols = np.nonzero(mask)
+    z = result['z'][rows, cols]
+    df = pd.DataFrame({
+        '날짜': days[cols],
+        '요일': pd.Categorical(days[cols].weekday.map(daycall_store.day_name_map), categories=daycall_store.weekday_order, ordered=True),
+        '팀명': result['teams'][rows],
+        level: result['names'][rows],
+        '처리호': result['values'][rows, cols].astype('int64'),
+        '기준선': result['baseline'][rows, cols].round(1),
+        '차이': result['residual'][rows, cols].round(1),
+        'z': z.round(2),
+        '구분': np.where(z > 0, '급증', '급감'),
+    })
+    return df.sort_values(['날짜', 'z'], ascending=[False, False], key=lambda col: col.abs() if col.name == 'z' else col).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='업체/부서별 콜 급증·급감 일자 탐지')
+    parser.add_argument('--level', choices=['쇼핑몰명', '팀명'], default='쇼핑몰명')
+    parser.add_argument('--days', type=int, default=60, help='탐지 대상 최근 영업일 수')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    daily = load_window(args.days)
+    start = time.perf_counter()
+    scores = score(daily)
+    df_flagged = flagged(scores, args.level, args.threshold, since=scores['days'][-args.days] if scores is not None else None)
+    print(f"{len(daily)} rows, {len(df_flagged)} flagged in {time.perf_counter() - start:.3f}s")
+    print(df_flagged.head(30).to_string(index=False))
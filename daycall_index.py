@@ -0,0 +1,61 @@
+# daycall_index.py
+import numpy as np
+import pandas as pd
+
+import daycall_query
+
+# 데이터 버전마다 한 번 만드는 팀/업체별 행 위치 색인: (이름, 시점) 순으로 정렬해 두면 이름마다 행이 연속 구간이므로
+# 선택은 구간 합치기 + take가 되어 비용이 전체 행 수가 아니라 선택된 행 수에 비례
+# 일별 색인은 화면에서 쓰는 최근 구간(WINDOW_DAYS)만 보관하고, 그보다 오래된 대상은 daycall_query로 조회
+WINDOW_DAYS = 120
+
+
+def build(df, level, time_col):
+    df = df.sort_values([level, time_col], kind='stable').reset_index(drop=True)
+    names = df[level].to_numpy()
+    if len(df):
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+        stops = np.r_[starts[1:], len(df)]
+    else:
+        starts = stops = np.empty(0, dtype=np.intp)
+    return {'frame': df, 'level': level, 'time_col': time_col,
+            'offsets': {name: (start, stop) for name, start, stop in zip(names[starts], starts, stops)}}
+
+
+def build_indexes(level, window_days=WINDOW_DAYS):
+    # 월별: 전체 기간 (이름, 월) 합계 / 일별: 최근 window_days일 (이름, 날짜) 합계 + 월
+    monthly = daycall_query.select(level, None, 'monthly')
+    end = daycall_query.last_day()
+    start = None if end is None else end - pd.Timedelta(days=window_days)
+    daily = daycall_query.select(level, None, 'daily', None if start is None else start.strftime('%Y-%m-%d'))
+    # 월 문자열은 일자 종류만큼만 변환
+    days, day_codes = np.unique(daily['날짜'].to_numpy(), return_inverse=True)
+    daily['월'] = pd.DatetimeIndex(days).strftime('%Y-%m').to_numpy()[day_codes]
+    return {'level': level, 'daily_start': start, 'monthly': build(monthly, level, '월'), 'daily': build(daily, level, '날짜')}
+
+
+def positions(index, names):
+    spans = [index['offsets'][name] for name in names if name in index['offsets']]
+    if not spans:
+        return np.empty(0, dtype=np.intp)
+    return np.concatenate([np.arange(start, stop) for start, stop in spans])
+
+
+def take(index, names):
+    # 선택된 행만 복사 (원본 색인은 세션 간 공유되므로 수정하지 않음)
+    rows = index['frame'].take(positions(index, names))
+    return rows.sort_values([index['time_col'], index['level']], kind='stable').reset_index(drop=True)
+
+
+def select(indexes, names):
+    return take(indexes['monthly'], names)
+
+
+def select_recent(indexes, names, days):
+    # daycall_query.select_recent와 같은 결과: 선택 대상의 마지막 일자 기준 최근 days일
+    rows = take(indexes['daily'], names)
+    start = rows['날짜'].max() - pd.Timedelta(days=days) if not rows.empty else None
+    if start is None or start < indexes['daily_start']:
+        # 색인 구간보다 오래된 일자가 필요하면 저장소에서 직접 조회
+        return daycall_query.select_recent(indexes['level'], names, days)
+    return rows.loc[rows['날짜'] >= start, ['날짜', indexes['level'], '총처리호']].reset_index(drop=True)
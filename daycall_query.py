@@ -0,0 +1,126 @@
+# daycall_query.py
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import acero
+
+import daycall_rollup
+import daycall_store
+
+# 증분 집계 큐브(일자별/월별 parquet 파일)를 pyarrow dataset으로 조회
+# 기간 조건은 파일 이름(일자/월)으로 읽을 파일을 고르고, 팀/업체 조건은 스캔 시 predicate로 넘겨
+# 선택된 행만 읽으며 Arrow 실행 엔진(acero)에서 스트리밍 집계 (메모리는 전체 이력이 아니라 결과 크기에 비례)
+GRAINS = {'daily': ('daily', '날짜'), 'monthly': ('monthly', '월')}
+# 파일마다 dictionary 인덱스 폭이 달라도 한 스키마로 읽도록 이름 컬럼은 문자열로 통일
+NAME_TYPE = pa.string()
+
+
+def _files(grain, start=None, end=None):
+    folder = os.path.join(daycall_rollup.ROLLUP_DIR, GRAINS[grain][0])
+    if not os.path.isdir(folder):
+        return []
+    keys = sorted(name[:-len('.parquet')] for name in os.listdir(folder) if name.endswith('.parquet'))
+    return [os.path.join(folder, f'{key}.parquet') for key in keys
+            if (start is None or key >= str(start)) and (end is None or key <= str(end))]
+
+
+def _dataset(paths, columns):
+    schema = ds.dataset(paths[0], format='parquet').schema
+    fields = [pa.field(col, NAME_TYPE) if col in ('팀명', '쇼핑몰명', '요일', '월') else schema.field(col) for col in columns]
+    return ds.dataset(paths, schema=pa.schema(fields), format='parquet')
+
+
+def _aggregate(dataset, keys, values, predicate=None):
+    # scan(predicate는 row group 통계로 건너뛰는 데 사용) -> filter -> hash 집계
+    plan = [acero.Declaration('scan', acero.ScanNodeOptions(dataset, columns=[*keys, *values], filter=predicate))]
+    if predicate is not None:
+        plan.append(acero.Declaration('filter', acero.FilterNodeOptions(predicate)))
+    plan.append(acero.Declaration('aggregate', acero.AggregateNodeOptions(
+        [(value, 'hash_sum', None, value) for value in values], keys=keys)))
+    df = acero.Declaration.from_sequence(plan).to_table().to_pandas()
+    return df.sort_values(keys).reset_index(drop=True)[[*keys, *values]]
+
+
+def select(level, names, grain='daily', start=None, end=None, values=('총처리호',)):
+    # 선택된 팀/업체의 기간 내 합계 (level: '팀명' 또는 '쇼핑몰명', names=None이면 전체)
+    time_col = GRAINS[grain][1]
+    values = list(values)
+    paths = _files(grain, start, end)
+    if not paths or (names is not None and not names):
+        return pd.DataFrame({time_col: pd.Series(dtype='datetime64[us]' if grain == 'daily' else 'str'),
+                             level: pd.Series(dtype='str'), **{value: pd.Series(dtype='int64') for value in values}})
+    dataset = _dataset(paths, [time_col, level, *values])
+    predicate = pc.field(level).isin(list(names)) if names is not None else None
+    return _aggregate(dataset, [time_col, level], values, predicate=predicate)
+
+
+def iter_select(level, names, grain='daily', start=None, end=None, values=tuple(daycall_rollup.measures)):
+    # select와 같은 결과를 파일(일자/월) 단위로 나눠 반환: 내보내기처럼 결과가 클 때 메모리를 파일 하나 크기로 제한
+    time_col = GRAINS[grain][1]
+    values = list(values)
+    predicate = pc.field(level).isin(list(names)) if names is not None else None
+    for path in _files(grain, start, end):
+        df = _aggregate(_dataset([path], [time_col, level, *values]), [time_col, level], values, predicate=predicate)
+        if len(df):
+            yield df
+
+
+def row_bound(level, names, grain='daily', start=None, end=None):
+    # iter_select 결과 행 수의 상한 (파일 하나에 이름당 최대 한 행). 큐브를 스캔하지 않고 파일 목록/메타데이터만 사용
+    paths = _files(grain, start, end)
+    if names is not None:
+        return len(names) * len(paths)
+    return sum(pq.ParquetFile(path).metadata.num_rows for path in paths)
+
+
+def last_day(level=None, names=None):
+    # 선택 대상의 마지막 데이터 일자: 최근 일자 파일부터 거꾸로 확인하므로 보통 파일 하나만 읽음
+    for path in reversed(_files('daily')):
+        if level is None:
+            return pd.Timestamp(os.path.basename(path)[:-len('.parquet')])
+        if not names:
+            return None
+        dataset = _dataset([path], ['날짜', level])
+        if dataset.count_rows(filter=pc.field(level).isin(list(names))):
+            return pd.Timestamp(os.path.basename(path)[:-len('.parquet')])
+    return None
+
+
+def select_recent(level, names, days, values=('총처리호',)):
+    # 선택 대상의 마지막 데이터 일자 기준 최근 days일 일자별 합계
+    end = last_day(level, names)
+    if end is None:
+        return select(level, [], 'daily', values=values)
+    start = end - pd.Timedelta(days=days)
+    return select(level, names, 'daily', start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), values=values)
+
+
+def daily_rows(start=None, end=None, columns=('날짜', '팀명', '쇼핑몰명', '총처리호')):
+    # 기간 내 (날짜, 팀명, 쇼핑몰명) 일자별 큐브 행을 집계 없이 조회
+    columns = list(columns)
+    paths = _files('daily', start, end)
+    if not paths:
+        return pd.DataFrame({col: pd.Series(dtype='datetime64[us]' if col == '날짜' else 'str' if col in ('팀명', '쇼핑몰명', '요일') else 'int64')
+                             for col in columns})
+    return _dataset(paths, columns).to_table(columns=columns).to_pandas()
+
+
+def totals(measures=tuple(daycall_rollup.measures)):
+    # 전체 콜 현황 차트용 일자별/월별 합계
+    measures = list(measures)
+    daily_paths, monthly_paths = _files('daily'), _files('monthly')
+    if not daily_paths or not monthly_paths:
+        empty = {value: pd.Series(dtype='int64') for value in measures}
+        return {'total_daily': pd.DataFrame({'날짜': pd.Series(dtype='datetime64[us]'),
+                                             '요일': pd.Categorical([], categories=daycall_store.weekday_order, ordered=True), **empty}),
+                'total_monthly': pd.DataFrame({'월': pd.Series(dtype='str'), **empty})}
+
+    total_daily = _aggregate(_dataset(daily_paths, ['날짜', '요일', *measures]), ['날짜', '요일'], measures)
+    total_daily = total_daily[total_daily['총처리호'] != 0].reset_index(drop=True)
+    total_daily['요일'] = pd.Categorical(total_daily['요일'], categories=daycall_store.weekday_order, ordered=True)
+    total_monthly = _aggregate(_dataset(monthly_paths, ['월', *measures]), ['월'], measures)
+    return {'total_daily': total_daily, 'total_monthly': total_monthly}
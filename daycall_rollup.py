@@ -0,0 +1,111 @@
+# daycall_rollup.py
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import daycall_store
+
+measures = ['총처리호', '응대호', '발신호']
+
+# 증분 집계 저장 위치: 일자별 (날짜, 팀명, 쇼핑몰명) 큐브, 월별 (월, 팀명, 쇼핑몰명) 큐브, 반영된 파티션 버전
+ROLLUP_DIR = os.path.join(daycall_store.STORE_DIR, '_rollup')
+APPLIED_PATH = os.path.join(ROLLUP_DIR, '_applied.json')
+# 같은 프로세스의 세션(스레드)들이 같은 임시 파일에 동시에 쓰지 않도록 sync는 한 번에 하나만
+_sync_lock = threading.Lock()
+
+
+def _daily_cube(df_daycall):
+    if df_daycall.empty:
+        df_daycall = pd.DataFrame({'날짜': pd.to_datetime([]), '팀명': [], '쇼핑몰명': [], **{m: [] for m in measures}})
+
+    daily = df_daycall.groupby(['날짜', '팀명', '쇼핑몰명'], observed=True, sort=True)[measures].sum().reset_index()
+    daily['요일'] = pd.Categorical(daily['날짜'].dt.weekday.map(daycall_store.day_name_map),
+                                 categories=daycall_store.weekday_order, ordered=True)
+    daily['월'] = daily['날짜'].dt.strftime('%Y-%m')
+    return daily
+
+
+def build_rollups(df_daycall):
+    # 원본 전체로 (날짜, 팀명, 쇼핑몰명) 일별 큐브와 (월, 팀명, 쇼핑몰명) 월별 큐브를 한 번에 집계 (증분 집계 검증/벤치마크용)
+    # 화면 조회는 저장된 큐브를 daycall_query(전체 합계, 내보내기)와 daycall_index(팀/업체 선택)로만 읽음
+    daily = _daily_cube(df_daycall)
+    monthly = daily.groupby(['월', '팀명', '쇼핑몰명'], observed=True, sort=True)[measures].sum().reset_index()
+    return {'daily': daily, 'monthly': monthly}
+
+
+def _write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    pq.write_table(pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _daily_path(day):
+    return os.path.join(ROLLUP_DIR, 'daily', f'{day}.parquet')
+
+
+def _monthly_path(month):
+    return os.path.join(ROLLUP_DIR, 'monthly', f'{month}.parquet')
+
+
+def _read_applied():
+    try:
+        with open(APPLIED_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def apply_month_days(month, days):
+    # 같은 달의 바뀐 일자들만 다시 집계해 일별 큐브를 교체하고, 월별 큐브는 그 달의 일별 큐브 전체로 다시 집계
+    # (이전 값과의 차이를 더하지 않으므로 여러 세션/프로세스가 같은 일자를 동시에 반영해도 두 번 합산되지 않음)
+    keys = ['월', '팀명', '쇼핑몰명']
+    new_daily = _daily_cube(daycall_store.read_days(days))
+    day_keys = new_daily['날짜'].dt.strftime('%Y-%m-%d')
+    for day in days:
+        _write_parquet(new_daily[day_keys == day], _daily_path(day))
+
+    daily_folder = os.path.join(ROLLUP_DIR, 'daily')
+    month_daily = _read_paths(sorted(os.path.join(daily_folder, name) for name in os.listdir(daily_folder)
+                                     if name.startswith(month) and name.endswith('.parquet')))
+    if month_daily is None:
+        month_daily = new_daily
+    monthly = month_daily.astype({'팀명': str, '쇼핑몰명': str}).groupby(keys, sort=True)[measures].sum().reset_index()
+    monthly = monthly[(monthly[measures] != 0).any(axis=1)]
+    _write_parquet(monthly, _monthly_path(month))
+
+
+def sync():
+    # 저장소에서 새로 쓰였거나 바뀐 일자 파티션만 읽어 집계에 반영 (비용은 바뀐 달의 크기에 비례)
+    with _sync_lock:
+        versions = daycall_store.partition_versions()
+        applied = _read_applied()
+        changed = sorted(day for day, version in versions.items() if applied.get(day) != version)
+        for month in sorted({day[:7] for day in changed}):
+            month_days = [day for day in changed if day[:7] == month]
+            apply_month_days(month, month_days)
+            applied.update({day: versions[day] for day in month_days})
+        if changed:
+            os.makedirs(ROLLUP_DIR, exist_ok=True)
+            tmp_path = f'{APPLIED_PATH}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(applied, f)
+            os.replace(tmp_path, APPLIED_PATH)
+        return changed
+
+
+def rollup_version():
+    # 캐시 키로 사용: 집계에 새 일자가 반영될 때마다 바뀜
+    if not os.path.exists(APPLIED_PATH):
+        return None
+    return os.stat(APPLIED_PATH).st_mtime_ns
+
+
+def _read_paths(paths):
+    if not paths:
+        return None
+    return pa.concat_tables([pq.read_table(path, memory_map=True) for path in paths], promote_options='permissive').to_pandas()
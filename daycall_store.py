@@ -0,0 +1,152 @@
+# daycall_store.py
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import call_schema
+
+base_path = os.path.dirname(__file__)
+STORE_DIR = os.path.join(base_path, 'data', 'mall_daycall_store')
+MANIFEST_PATH = os.path.join(STORE_DIR, '_manifest.json')
+# 파티션 스키마(call_schema.DAYCALL_SCHEMA)나 manifest 구조가 바뀌면 올려서 저장소를 다시 만들도록 함
+STORE_SCHEMA_VERSION = 3
+
+day_name_map = {0: '월요일', 1: '화요일', 2: '수요일', 3: '목요일', 4: '금요일', 5: '토요일', 6: '일요일'}
+weekday_order = ['월요일', '화요일', '수요일', '목요일', '금요일']
+# 같은 프로세스의 세션(스레드)들이 같은 임시 파일/manifest를 동시에 쓰지 않도록 반영은 한 번에 하나만
+_ingest_lock = threading.Lock()
+
+
+def prepare_daycall(df_daycall):
+    # 요일 매핑 (0건 제거와 날짜 파싱은 call_schema 리더가 읽는 시점에 처리, ingest 시 한 번만 수행)
+    df_daycall['요일'] = df_daycall['날짜'].dt.weekday.map(day_name_map)
+    df_daycall['요일'] = pd.Categorical(df_daycall['요일'], categories=weekday_order, ordered=True)
+    return df_daycall
+
+
+def _read_manifest():
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('schema_version') == STORE_SCHEMA_VERSION:
+            return manifest
+    return {'schema_version': STORE_SCHEMA_VERSION, 'files': {}, 'days': [], 'partitions': {}}
+
+
+def _write_manifest(manifest):
+    tmp_path = f'{MANIFEST_PATH}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _partition_path(day):
+    return os.path.join(STORE_DIR, f'{day}.parquet')
+
+
+def _file_signature(file_path):
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def pending_files(file_entries):
+    # 반영할 파일만 고름: manifest를 한 번만 읽고 data_catalog 항목의 크기/수정시각과 비교 (파일을 다시 stat하지 않음)
+    files = _read_manifest()['files']
+    return [entry for entry in file_entries
+            if {key: files.get(os.path.basename(entry['path']), {}).get(key) for key in ('size', 'mtime')}
+            != {'size': entry['size'], 'mtime': entry['mtime']}]
+
+
+def ingest_csv(file_path):
+    with _ingest_lock:
+        return _ingest_csv(file_path)
+
+
+def _ingest_csv(file_path):
+    # 이미 변환된 파일(크기/수정시각 동일)은 stat 한 번으로 건너뜀
+    signature = _file_signature(file_path)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    manifest = _read_manifest()
+    file_name = os.path.basename(file_path)
+    stored = manifest['files'].get(file_name, {})
+    if {key: stored.get(key) for key in signature} == signature:
+        return []
+
+    df_daycall, memory = call_schema.read_daycall_csv(file_path)
+    df_daycall = prepare_daycall(df_daycall)
+    days = df_daycall['날짜'].dt.strftime('%Y-%m-%d')
+
+    # 저장소의 마지막 일자는 부분 집계였을 수 있으므로 다시 쓰고, 그 이후 일자만 추가
+    known_days = set(manifest['days'])
+    last_stored = max(known_days) if known_days else ''
+    new_days = sorted(day for day in days.unique() if day >= last_stored or day not in known_days)
+    partitions = manifest.setdefault('partitions', {})
+
+    for day, df_day in df_daycall[days.isin(new_days)].groupby(days[days.isin(new_days)]):
+        table = pa.Table.from_pandas(df_day.reset_index(drop=True), preserve_index=False)
+        tmp_path = f'{_partition_path(day)}.{os.getpid()}.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, _partition_path(day))
+        partitions[day] = os.stat(_partition_path(day)).st_mtime_ns
+
+    manifest['files'][file_name] = {**signature, **memory}
+    manifest['days'] = sorted(known_days.union(new_days))
+    _write_manifest(manifest)
+    return new_days
+
+
+def store_version():
+    # 캐시 키로 사용: manifest가 갱신될 때마다 바뀜
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    return os.stat(MANIFEST_PATH).st_mtime_ns
+
+
+def partition_versions():
+    # 일자별 파티션 버전(다시 쓸 때마다 바뀜): 증분 집계가 어떤 일자를 다시 반영해야 하는지 판단
+    return _read_manifest().get('partitions', {})
+
+
+def stored_days(start_date=None, end_date=None):
+    return [day for day in _read_manifest()['days']
+            if (start_date is None or day >= str(start_date)) and (end_date is None or day <= str(end_date))]
+
+
+def partition_signatures(start_date=None, end_date=None):
+    # 기간 내 파티션 파일의 (일자, 크기, 수정시각): 입력 변경 여부 판단용
+    signatures = []
+    for day in stored_days(start_date, end_date):
+        stat = os.stat(_partition_path(day))
+        signatures.append((day, stat.st_size, stat.st_mtime_ns))
+    return signatures
+
+
+def count_rows(start_date=None, end_date=None):
+    # 기간 내 원본 행 수 (파티션 parquet 메타데이터만 읽음)
+    return sum(pq.ParquetFile(_partition_path(day)).metadata.num_rows for day in stored_days(start_date, end_date))
+
+
+def read_store(start_date=None, end_date=None):
+    return read_days(stored_days(start_date, end_date))
+
+
+def iter_days(start_date=None, end_date=None, teams=None, malls=None):
+    # 일자 파티션 하나씩 읽어 반환 (팀/업체 조건은 읽을 때 적용). 이름 컬럼은 파티션마다 범주가 달라 문자열로 변환
+    for day in stored_days(start_date, end_date):
+        filters = [(col, 'in', list(names)) for col, names in [('팀명', teams), ('쇼핑몰명', malls)] if names is not None]
+        df_day = pq.read_table(_partition_path(day), filters=filters or None).to_pandas()
+        if len(df_day):
+            yield df_day.astype({'쇼핑몰명': str, '팀명': str, '요일': str})
+
+
+def read_days(days):
+    if not days:
+        return pd.DataFrame()
+    tables = [pq.read_table(_partition_path(day), memory_map=True) for day in days]
+    df_daycall = pa.concat_tables(tables).to_pandas()
+    df_daycall['요일'] = pd.Categorical(df_daycall['요일'], categories=weekday_order, ordered=True)
+    return df_daycall
@@ -0,0 +1,35 @@
+# daycall_watch.py
+import argparse
+import time
+
+import daycall_rollup
+import daycall_store
+import data_catalog
+
+
+def poll_once():
+    # 새로 들어왔거나 바뀐 파일만 파싱해서 저장소에 반영하고, 바뀐 일자만 집계에 더함
+    # (같은 이름으로 덮어쓴 파일은 폴더 수정시각이 바뀌지 않으므로 catalog를 직접 갱신)
+    data_catalog.refresh('mall_daycall')
+    new_days = set()
+    for daycall_file in daycall_store.pending_files(data_catalog.date_range('mall_daycall')):
+        new_days.update(daycall_store.ingest_csv(daycall_file['path']))
+    synced_days = daycall_rollup.sync()
+    return sorted(new_days), synced_days
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='data/mall_daycall 폴더 감시 후 증분 반영')
+    parser.add_argument('--interval', type=float, default=5.0, help='폴더 확인 주기(초)')
+    parser.add_argument('--once', action='store_true', help='한 번만 반영하고 종료')
+    args = parser.parse_args()
+
+    while True:
+        start = time.perf_counter()
+        new_days, synced_days = poll_once()
+        if new_days or synced_days:
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} ingested {len(new_days)} days, "
+                  f"updated aggregates for {len(synced_days)} days in {time.perf_counter() - start:.2f}s")
+        if args.once:
+            break
+        time.sleep(args.interval)
@@ -2,81 +2,96 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
 import plotly.graph_objects as go
-import glob
-from datetime import datetime
 import os
 
-@st.cache_data
-def load_data(folder_path):
-    # 현재 파일의 경로를 기준으로 절대 경로 생성
-    base_path = os.path.dirname(__file__)
-    folder_path = os.path.join(base_path, folder_path)
-    csv_files = glob.glob(f'{folder_path}/*.csv')
-
-    def extract_date(file_path):
-        file_name = file_path.split('/')[-1]
-        date_str = file_name.split('_')[-1].split('.')[0]
-        return datetime.strptime(date_str, '%Y-%m')
-
-    latest_file = max(csv_files, key=extract_date)
-    df = pd.read_csv(latest_file)
+import batch_forecast
+import call_scenario
+import call_schema
+import chart_render
+import data_catalog
+import daycall_rollup
+import daycall_store
+import model_cache
+import model_selection
+import perf_trace
+import result_cache
+
+@perf_trace.traced('load')
+def load_data(dataset):
+    # data_catalog 색인에서 최신 유효 스냅샷을 조회 (깨진 파일은 색인 시 제외됨)
+    latest = data_catalog.latest_valid(dataset)
+    if latest is None:
+        return pd.DataFrame()
+    # 새 스냅샷이 들어오면 checksum이 바뀌므로 캐시가 자동으로 갱신됨
+    return read_snapshot(latest['path'], latest['checksum'])
+
+@perf_trace.cache_data('load', max_entries=1)
+@result_cache.shared('month_call_snapshot', version_arg=1)
+def read_snapshot(latest_file, checksum):
+    df, _ = call_schema.read_month_call_csv(latest_file)
     df = df[['ds', 'y']]
-    df['ds'] = pd.to_datetime(df['ds'])
     df = df.set_index('ds')
     df.index.freq = 'MS'
     return df
 
-@st.cache_data
-def fit_model(df_log):
-    order = (1, 1, 1)
-    seasonal_order = (2, 0, 1, 12)
-    model = sm.tsa.SARIMAX(df_log, order=order, seasonal_order=seasonal_order, enforce_stationarity=False, enforce_invertibility=False)
-    fit_result = model.fit(disp=False, maxiter=1000)
-    return fit_result
-
+@perf_trace.cache_data('fit')
+def fit_model(df_log, order=model_selection.DEFAULT_ORDER, seasonal_order=model_selection.DEFAULT_SEASONAL_ORDER):
+    # 프로세스 간 공유되는 디스크 캐시에 학습 결과가 있으면 재학습하지 않음
+    return model_cache.get_or_fit(df_log, model_selection.fit_sarimax, update=model_selection.update_sarimax, order=order, seasonal_order=seasonal_order)
+
+@perf_trace.traced('fit')
+def select_order(df_log):
+    # model_selection 배치가 저장한 탐색 결과만 조회 (화면 요청에서는 백테스트 학습을 하지 않음)
+    # 새 스냅샷에 대한 결과가 아직 없거나 읽을 수 없거나, 모든 후보의 백테스트가 실패했으면 기본 모형을 사용
+    try:
+        selection = model_selection.load_selection(df_log)
+        if selection is not None and selection['best']['mape'] is not None and np.isfinite(selection['best']['mape']):
+            return selection['best']['order'], selection['best']['seasonal_order'], selection
+        if selection is not None:
+            return model_selection.DEFAULT_ORDER, model_selection.DEFAULT_SEASONAL_ORDER, selection
+    except (KeyError, TypeError):
+        pass
+    return model_selection.DEFAULT_ORDER, model_selection.DEFAULT_SEASONAL_ORDER, None
+
+def model_caption(order, seasonal_order, selection):
+    if selection is None:
+        return f'모형 SARIMAX{order}{seasonal_order} (기본 모형) · 백테스트 MAPE 산출 대기 (model_selection.py 배치 실행 후 표시)'
+    candidates = selection['candidates']
+    selected_by = '기본 모형' if len(candidates) == 1 else f'후보 {len(candidates)}개 중 선택'
+    score = selection['best']['mape']
+    if score is None or not np.isfinite(score):
+        return f'모형 SARIMAX{order}{seasonal_order} ({selected_by}) · 백테스트 MAPE 산출 실패'
+    return (f"모형 SARIMAX{order}{seasonal_order} ({selected_by}) · 최근 {selection['n_origins']}개 시점 rolling-origin 백테스트 "
+            f"MAPE {score:.1f}%, 정확도 {100 - score:.1f}%")
+
+@perf_trace.traced('render')
 def call_forecast():
-    folder_path = 'data/month_call_total'
-    df = load_data(folder_path)
+    df = load_data('month_call_total')
 
     if not df.empty:
         df_log = np.log(df)
 
+        order, seasonal_order, selection = select_order(df_log)
         try:
-            predict = fit_model(df_log)
+            predict = fit_model(df_log, order, seasonal_order)
         except Exception as e:
             st.error(f"Model fitting failed: {e}")
             predict = None
 
         if predict:
-            predict_mean = np.exp(predict.get_forecast(7).predicted_mean)
-            conf_int = predict.get_forecast(7).conf_int()
+            st.info(model_caption(order, seasonal_order, selection))
+
+            forecast = predict.get_forecast(7)
+            predict_mean = np.exp(forecast.predicted_mean)
+            conf_int = forecast.conf_int()
             conf_int_lb = np.exp(conf_int['lower y'])
             conf_int_ub = np.exp(conf_int['upper y'])
 
-            fig, ax = plt.subplots(figsize=(14, 5))
-            ax.plot(df, color='blue', label='Actual Values')
-            ax.plot(predict_mean, label=f'Predicted Values (model = (1,1,1),(2,0,1,12))', color='red', linestyle='--', alpha=0.5)
-            ax.fill_between(predict_mean.index, conf_int_lb, conf_int_ub, color='red', alpha=0.1, label='95% Confidence Interval')
-
-            for x, y in zip(df.index, df['y']):
-                ax.text(x, y, f'{int(y)}', color='blue', fontsize=8, ha='center', va='bottom')
-
-            for x, y in zip(predict_mean.index, predict_mean):
-                ax.text(x, y, f'{int(y)}', color='red', fontsize=8, ha='center', va='bottom')
-
-            ax.set_ylim(20000, 120000)
-            ax.legend(loc='upper right')
-            ax.set_title('SIIC phone call : total values')
-            ax.grid(True, which='both', linestyle='--', linewidth=0.5, color='gray', alpha=0.7)
-
-            st.pyplot(fig)
-
+            # 전체 이력은 (matplotlib 이미지를 따로 그리지 않고) 아래 차트의 기간 슬라이더를 처음까지 옮겨 조회
             max_date = df.index.max()
             start_control_date = max_date - pd.DateOffset(months=13)
-            min_date = max_date - pd.DateOffset(months=36)
+            min_date = df.index.min()
             max_forecast_date = max_date + pd.DateOffset(months=0)
 
             if 'start_date' not in st.session_state:
@@ -117,3 +132,97 @@ def call_forecast():
             st.error("Prediction model fitting failed.")
     else:
         st.error("Failed to retrieve data from Google Sheets.")
+
+@perf_trace.cache_resource('fit', max_entries=2)
+def simulate_scenarios(df_log, order, seasonal_order):
+    # 월별 콜 처리량 경로를 모형당 한 번만 생성해 세션 간 공유 (읽기 전용). 기간/분위수/인원 조건은 이 경로에서 바로 계산
+    return np.exp(call_scenario.simulate_paths(fit_model(df_log, order, seasonal_order)))
+
+@perf_trace.cache_data('aggregate', max_entries=1)
+def load_weekday_profile(store_version):
+    # 저장소 버전이 바뀌면 새 일자를 집계 큐브에 반영한 뒤 요일 분포를 다시 계산 (이 탭만 열어도 최신 일자 기준)
+    daycall_rollup.sync()
+    return call_scenario.weekday_profile()
+
+@perf_trace.traced('render')
+def display_scenarios():
+    df = load_data('month_call_total')
+    if df.empty:
+        st.error("Failed to retrieve data from Google Sheets.")
+        return
+    df_log = np.log(df)
+
+    try:
+        order, seasonal_order, _ = select_order(df_log)
+        paths = simulate_scenarios(df_log, order, seasonal_order)
+    except Exception as e:
+        st.error(f"Scenario simulation failed: {e}")
+        return
+    months = call_scenario.path_months(df.index.max(), paths.shape[1])
+
+    horizon = st.slider('시나리오 기간 (개월)', 1, len(months), 12)
+    df_quantiles = call_scenario.quantile_table(paths[:, :horizon], months[:horizon])
+    history = df['y'].iloc[-24:]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=history.index, y=history, mode='lines+markers', name='Actual Values', line_color='blue'))
+    for low, high, alpha in (('P10', 'P90', 0.1), ('P25', 'P75', 0.2)):
+        fig.add_trace(go.Scatter(x=df_quantiles.index, y=df_quantiles[low], mode='lines', line_width=0, showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=df_quantiles.index, y=df_quantiles[high], mode='lines', line_width=0, fill='tonexty',
+                                 fillcolor=f'rgba(255, 0, 0, {alpha})', name=f'{low}~{high}'))
+    fig.add_trace(go.Scatter(x=df_quantiles.index, y=df_quantiles['P50'], mode='lines+markers', name='P50', line=dict(dash='dash', color='red')))
+    fig.update_layout(
+        title=f'콜 처리량 시나리오 (경로 {len(paths):,}개, M+{horizon})',
+        xaxis=dict(tickformat='%Y-%m'),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        margin=dict(l=40, r=40, t=40, b=40),
+        hovermode='x unified',
+        height=300
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 요일별 필요 인원: 대상 월의 경로별 총량을 최근 일별 콜의 요일 분포로 나눔 (조건을 바꿔도 재학습/재생성 없음)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        month = st.selectbox('대상 월', [m.strftime('%Y-%m') for m in months[:horizon]])
+    with col2:
+        quantile = st.slider('서비스 수준 (분위수)', 0.5, 0.99, 0.9, 0.01)
+    with col3:
+        calls_per_agent = st.number_input('1인당 하루 처리호', min_value=1.0, value=100.0, step=5.0)
+    with col4:
+        current_staff = st.number_input('현재 인원 (0이면 생략)', min_value=0, value=0, step=1)
+
+    position = months.get_loc(pd.Timestamp(month))
+    shares = call_scenario.daily_shares(months[[position]], load_weekday_profile(daycall_store.store_version()))
+    calls = call_scenario.daily_calls(paths[:, [position]], shares)[:, 0, :]
+    st.write(f'*{month} 요일별 필요 인원*')
+    st.dataframe(call_scenario.staffing(calls, shares.columns, calls_per_agent, quantile, current_staff).round(1))
+
+    st.write('*월별 콜 처리량 분위수*')
+    df_quantiles.index = df_quantiles.index.strftime('%Y-%m')
+    st.dataframe(df_quantiles.round(0))
+
+@perf_trace.cache_data('load', max_entries=1)
+def load_batch_forecast(forecast_version):
+    return batch_forecast.load_forecast()
+
+@perf_trace.traced('render')
+def display_batch_forecast():
+    # batch_forecast.py 야간 배치가 저장한 팀/업체별 예측(전체 합계에 맞게 조정된 값)을 조회
+    forecast_version = os.path.getmtime(batch_forecast.FORECAST_PATH) if os.path.exists(batch_forecast.FORECAST_PATH) else None
+    df_forecast = load_batch_forecast(forecast_version)
+    if df_forecast.empty:
+        st.warning("팀/업체별 예측 결과가 없습니다. batch_forecast.py 배치를 먼저 실행하세요.")
+        return
+
+    level = st.radio('예측 단위', ['팀명', '쇼핑몰명'], horizontal=True)
+    df_level = df_forecast[df_forecast['level'] == level]
+    selected_names = st.multiselect('조회 대상을 선택하세요', [*df_level['name'].unique()])
+    df_selected = df_level[df_level['name'].isin(selected_names)]
+
+    fig = chart_render.line(df_selected, '날짜', '예측처리호', color='name', title=f'{level}별 일자별 예측 처리호')
+    fig.update_layout(yaxis_title='처리호', xaxis_title='날짜', legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.write('*raw data*')
+    st.dataframe(df_selected.pivot_table(index='날짜', columns='name', values='예측처리호', aggfunc='sum').round(1))
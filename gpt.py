@@ -1,29 +1,130 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+
 import pandas as pd
 import openai
-import streamlit as st
 
-openai.api_key = 'sk-svcacct-jOMX0MHNiGnhgzYVOVLnT3BlbkFJdGrsqvnaXY6spS2T2xQx'
+import profit_kpi
+import profit_store
+
+base_path = os.path.dirname(__file__)
+GPT_CACHE_DIR = os.path.join(base_path, 'data', 'gpt_cache')
+GPT_MODEL = "gpt-4"
+SYSTEM_PROMPT = "너는 CS 운영실적을 분석하는 컨설턴트야."
 
 # 데이터 파일 경로를 함수 인자로 받도록 수정
 def load_gpt_df(file_path):
     return pd.read_excel(file_path)
 
-def gpt_analysis(gpt_df):
-    gpt_df['날짜'] = pd.to_datetime(gpt_df['날짜'])
-    gpt_df['년도'] = gpt_df['날짜'].dt.year
-    gpt_df['월'] = gpt_df['날짜'].dt.month
-    gpt_df['날짜'] = pd.to_datetime(gpt_df['날짜']).dt.strftime('%Y-%m')
-    data_analysis = gpt_df[gpt_df['년도'] == 2024]
-    prompt = f"{data_analysis.to_string()} SIIC라는 CS 대행 서비스를 제공하는 업체의 월별 운영실적파일이야. 각 서비스 별로 전월대비 어떠한 변화가 있는지 유의미한 수치 변화가 있는지 분석해줘. 기본적으로 서비스 별로 최근 월이 전월대비 어떠한 변화가 있는지 설명해주고, 각 서비스별로 어떠한 수치적인 변화가 있는지 분석해줘. 또 인사이트가 있다면 제공해줘."
-    response = ask_gpt(prompt)
+def _pct(current, previous):
+    if previous in (None, 0) or pd.isna(previous):
+        return 'n/a'
+    return f'{(current - previous) / abs(previous) * 100:+.1f}%'
+
+def summarize_services(gpt_df, year=None):
+    # 서비스별로 최근 월 값과 전월/전년 동월 대비 증감, 연간 누계만 남긴 짧은 요약 (전체 표를 보내지 않음)
+    monthly = profit_kpi.build_kpi_tables(profit_store.prepare_profit(gpt_df.copy()))['monthly']
+    year = year or int(monthly['연도'].max())
+    by_month = monthly.set_index(['서비스', '월'])[profit_kpi.measures]
+    summaries = {}
+    for service, service_monthly in monthly[monthly['연도'] == year].groupby('서비스'):
+        last_month = service_monthly['월'].max()
+        previous_month = (pd.Timestamp(last_month) - pd.DateOffset(months=1)).strftime('%Y-%m')
+        last_year_month = (pd.Timestamp(last_month) - pd.DateOffset(years=1)).strftime('%Y-%m')
+        current = by_month.loc[(service, last_month)]
+        lines = [f'[{service}] {last_month}']
+        for measure in profit_kpi.measures:
+            previous = by_month[measure].get((service, previous_month))
+            last_year = by_month[measure].get((service, last_year_month))
+            lines.append(f'{measure} {current[measure]:,} (전월대비 {_pct(current[measure], previous)}, 전년동월대비 {_pct(current[measure], last_year)})')
+        lines.append(f"{year}년 누계 매출 {service_monthly['매출'].sum():,}, 손익 {service_monthly['손익'].sum():,}")
+        summaries[service] = '\n'.join(lines)
+    return summaries
+
+def build_prompt(service, summary):
+    return f"{summary}\nSIIC라는 CS 대행 서비스를 제공하는 업체의 '{service}' 서비스 월별 운영실적 요약이야. 최근 월이 전월, 전년 동월 대비 어떠한 변화가 있는지, 유의미한 수치 변화가 있는지 분석해줘. 또 인사이트가 있다면 제공해줘."
+
+# 백엔드는 complete(system, prompt) 코루틴 함수이고, 응답 캐시 키에 쓰는 이름을 backend_name 속성으로 가짐
+def openai_backend(model=GPT_MODEL, timeout=60):
+    client = openai.AsyncOpenAI(api_key=os.environ.get('OPENAI_API_KEY'), timeout=timeout)
+
+    async def complete(system, prompt):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.choices[0].message.content
+    complete.backend_name = model
+    return complete
+
+def stub_backend(delay=0.5):
+    # 오프라인 벤치마크용 로컬 백엔드: API 호출 없이 지연 시간만 흉내냄
+    async def complete(system, prompt):
+        await asyncio.sleep(delay)
+        return f"[stub] {prompt.splitlines()[0]} ({len(prompt)} chars)"
+    complete.backend_name = f'stub-{delay}'
+    return complete
+
+def _cache_path(backend_name, system, prompt):
+    key = hashlib.sha256(json.dumps([backend_name, system, prompt], ensure_ascii=False).encode()).hexdigest()
+    return os.path.join(GPT_CACHE_DIR, f'{key}.json')
+
+async def _ask_cached(complete, backend_name, prompt, semaphore, timeout):
+    # 같은 프롬프트는 디스크 캐시에서 응답, 아니면 동시 요청 수를 제한해서 호출
+    path = _cache_path(backend_name, SYSTEM_PROMPT, prompt)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['response']
+    async with semaphore:
+        response = await asyncio.wait_for(complete(SYSTEM_PROMPT, prompt), timeout=timeout)
+    os.makedirs(GPT_CACHE_DIR, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'prompt': prompt, 'response': response}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
     return response
 
+async def analyze_services(summaries, complete, backend_name=None, max_concurrency=4, timeout=60):
+    # 캐시 키는 백엔드(모델)마다 달라야 하므로 이름을 인자나 백엔드의 backend_name 속성으로 받음
+    backend_name = backend_name or getattr(complete, 'backend_name', None)
+    if backend_name is None:
+        raise ValueError('backend_name is required for a backend without a backend_name attribute')
+    semaphore = asyncio.Semaphore(max_concurrency)
+    services = list(summaries)
+    results = await asyncio.gather(
+        *[_ask_cached(complete, backend_name, build_prompt(service, summaries[service]), semaphore, timeout) for service in services],
+        return_exceptions=True)
+    return {service: (f"분석 실패: {result!r}" if isinstance(result, BaseException) else result)
+            for service, result in zip(services, results)}
+
+def gpt_analysis(gpt_df, complete=None, backend_name=None):
+    summaries = summarize_services(gpt_df)
+    responses = asyncio.run(analyze_services(summaries, complete or openai_backend(), backend_name=backend_name))
+    return '\n\n'.join(f"### {service}\n{response}" for service, response in responses.items())
+
 def ask_gpt(prompt):
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "너는 CS 운영실적을 분석하는 컨설턴트야."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response['choices'][0]['message']['content']
+    return asyncio.run(openai_backend()(SYSTEM_PROMPT, prompt))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='서비스별 GPT 분석 파이프라인 (stub 백엔드로 오프라인 벤치마크 가능)')
+    parser.add_argument('--file', default=os.path.join(base_path, 'data', 'profit_month', 'profit_month.xlsx'))
+    parser.add_argument('--backend', choices=['openai', 'stub'], default='stub')
+    parser.add_argument('--delay', type=float, default=0.5, help='stub 백엔드 응답 지연(초)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    gpt_df = load_gpt_df(args.file)
+    summaries = summarize_services(gpt_df)
+    complete = stub_backend(args.delay) if args.backend == 'stub' else openai_backend()
+
+    start = time.perf_counter()
+    asyncio.run(analyze_services(summaries, complete, max_concurrency=args.concurrency))
+    print(f"{len(summaries)} services, prompt chars {sum(len(build_prompt(s, summaries[s])) for s in summaries):,} "
+          f"in {time.perf_counter() - start:.2f}s (cache dir {GPT_CACHE_DIR})")
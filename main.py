@@ -1,11 +1,11 @@
 import streamlit as st
 from datetime import datetime
-import mall_daycall  # 모듈을 import
-import demand_forecasting  # 모듈을 import
-import profit_month  # 모듈을 import
+import perf_trace
+# 페이지 모듈(statsmodels, plotly, openpyxl 등)은 해당 탭을 선택했을 때 import
 
 # 페이지 설정
 st.set_page_config(layout="wide")
+perf_trace.start_rerun()
 
 # 사이드바에 탭 추가
 st.sidebar.title('SIIC Data platform')
@@ -22,52 +22,75 @@ elif main_selected_tab == "SIIC Management":
     sub_selected_tab = st.sidebar.radio("SIIC Management", sub_tabs)
 
     if sub_selected_tab == "SIIC 운영현황":
+        import mall_daycall
         st.header("SIIC 운영현황")
         st.write(" :green[*raw data*]는 :blue[*csv 파일*]로 다운로드 가능합니다.")
         '''
         ---
         '''
-        df_daycall = mall_daycall.load_and_prepare_data('data/mall_daycall/pusan_mall_2024-07-22.csv')
+        mall_daycall.ingest_latest()
+        daycall_totals = mall_daycall.load_totals()
         
         # raw data
         # st.dataframe(df_daycall)
         
         # 탭 생성
-        c1, c2, c3 = st.tabs(['전체 콜 현황','부서별', '업체별'])
+        c1, c2, c3, c4 = st.tabs(['전체 콜 현황','부서별', '업체별', '이상 탐지'])
         
         # 월별 선차트
         with c1:
             c1.info('2024년도 "콜 현황 조회" 입니다')
-            mall_daycall.plot_daycall_charts(df_daycall)
+            mall_daycall.plot_daycall_charts(daycall_totals)
+            mall_daycall.display_raw_export()
         
-        mall_name = df_daycall['쇼핑몰명'].unique()
-        team_name = df_daycall['팀명'].unique()
+        mall_name = mall_daycall.load_names('쇼핑몰명')
+        team_name = mall_daycall.load_names('팀명')
         
         with c2:
             st.info('부서별 "콜 상세 현황 조회" 입니다.')
-            mall_daycall.display_team_data(df_daycall, team_name)
+            mall_daycall.display_team_data(team_name)
         
         with c3:
             st.info('업체별 "콜 상세 현황 조회" 입니다.')
-            mall_daycall.display_mall_data(df_daycall, mall_name)
+            mall_daycall.display_mall_data(mall_name)
+
+        with c4:
+            st.info('업체/부서별 "콜 급증·급감 일자 조회" 입니다.')
+            mall_daycall.display_anomalies()
 
     elif sub_selected_tab == "SIIC 운영실적":
+        import profit_month
         st.header("SIIC 운영실적")
         profit_month.display_profit_page()
 
     elif sub_selected_tab == "SIIC 수요예측":
+        import demand_forecasting
         st.subheader("SIIC 콜 처리량 수요예측")
-        st.info('5년간의 콜 처리 데이터를 기반으로 모델을 학습하여 향후 7개월 동안의 콜 처리량을 예측하였습니다. 2024년 1월부터 6월까지의 실제값과 예측값 간의 정확도를 MAPE 기준으로 측정한 결과, 현재 모형의 예측 성능은 94.7% 입니다.')
+        st.info('5년간의 콜 처리 데이터를 기반으로 모델을 학습하여 향후 7개월 동안의 콜 처리량을 예측하였습니다. 예측 성능은 최근 시점들을 기준으로 한 rolling-origin 백테스트의 MAPE로 측정합니다.')
         demand_forecasting.call_forecast()
+        '''
+        ---
+        '''
+        st.subheader("콜 처리량 시나리오 · 요일별 필요 인원")
+        demand_forecasting.display_scenarios()
+        '''
+        ---
+        '''
+        st.subheader("팀/업체별 콜 처리량 수요예측")
+        demand_forecasting.display_batch_forecast()
 
 elif main_selected_tab == "SIIC Reporting":
+    import report_page
     sub_tabs = ["SIIC 월간보고", "SIIC 일간보고"]
     sub_selected_tab = st.sidebar.radio("SIIC Reporting", sub_tabs)
 
     if sub_selected_tab == "SIIC 월간보고":
         st.header("SIIC 월간보고")
-        st.write("여기에 SIIC 월간보고에 대한 내용을 작성하세요.")
+        report_page.display_report_page('month')
 
     elif sub_selected_tab == "SIIC 일간보고":
         st.header("SIIC 일간보고")
-        st.write("여기에 SIIC 일간보고에 대한 내용을 작성하세요.")
+        report_page.display_report_page('day')
+
+# rerun별 구간 소요시간/메모리/캐시 적중 (사이드바 debug 패널)
+perf_trace.display_panel()
@@ -3,58 +3,122 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
-day_name_map = {0: '월요일', 1: '화요일', 2: '수요일', 3: '목요일', 4: '금요일', 5: '토요일', 6: '일요일'}
-
+import chart_render
+import data_export
+import daycall_anomaly
+import daycall_index
+import daycall_query
+import daycall_rollup
+import data_catalog
+import daycall_store
+import perf_trace
+import result_cache
+
+day_name_map = daycall_store.day_name_map
+
+@perf_trace.traced('load')
+def ingest_latest():
+    # data_catalog에 색인된 유효한 일별 파일을 기간 순으로 저장소에 반영 (이미 반영된 파일은 건너뜀)
+    daycall_files = data_catalog.date_range('mall_daycall')
+    if not daycall_files:
+        st.error("No valid mall_daycall file found.")
+        return False
+    # rerun마다 실행되므로 manifest는 한 번만 읽고, 아직 반영되지 않았거나 바뀐 파일만 반영
+    for daycall_file in daycall_store.pending_files(daycall_files):
+        daycall_store.ingest_csv(daycall_file['path'])
+    return True
+
+@perf_trace.traced('load')
 def load_and_prepare_data(file_path):
     try:
-        df_daycall = pd.read_csv(file_path)
-        df_daycall = df_daycall[df_daycall['총처리호'] != 0]
-        df_daycall['날짜'] = pd.to_datetime(df_daycall['날짜'], format='%Y-%m-%d')
-        df_daycall['요일'] = df_daycall['날짜'].dt.weekday.map(day_name_map)
-        weekday_order = ['월요일', '화요일', '수요일', '목요일', '금요일']
-        df_daycall['요일'] = pd.Categorical(df_daycall['요일'], categories=weekday_order, ordered=True)
-        return df_daycall
+        # 새로 들어온 일자만 parquet 저장소에 추가하고, 조회는 저장소에서 수행
+        daycall_store.ingest_csv(file_path)
     except FileNotFoundError:
         st.error(f"File {file_path} not found.")
         return pd.DataFrame()
-
-def plot_daycall_charts(df_daycall):
-    if df_daycall.empty:
-        st.warning("No data available to plot.")
-        return
-
-    df_daycall_daily = df_daycall.groupby(['날짜', '요일'])['총처리호'].sum().reset_index()
-    df_daycall_daily = df_daycall_daily[df_daycall_daily['총처리호'] != 0]
-    df_daycall_daily = df_daycall_daily.sort_values(by='날짜')
+    return load_store_data(daycall_store.store_version())
+
+# 데이터 버전이 바뀌면 이전 결과는 필요 없으므로 프로세스마다 최신 한 벌만 보관
+@perf_trace.cache_data('load', max_entries=1)
+def load_store_data(store_version):
+    return daycall_store.read_store()
+
+@perf_trace.traced('aggregate')
+def load_totals():
+    # 저장소에 새로 반영된 일자만 증분 집계에 더한 뒤 (daycall_watch 서비스가 이미 반영했다면 바로 반환) 전체 합계를 조회
+    daycall_rollup.sync()
+    return load_store_totals(daycall_rollup.rollup_version())
+
+@perf_trace.cache_data('aggregate', max_entries=1)
+@result_cache.shared('daycall_totals')
+def load_store_totals(rollup_version):
+    return daycall_query.totals()
+
+def load_index(level):
+    # 팀/업체별 행 위치 색인: 데이터 버전당 한 번 만들고 세션 간 복사 없이 공유
+    return load_store_index(level, daycall_rollup.rollup_version())
+
+@perf_trace.cache_resource('aggregate', max_entries=2)
+def load_store_index(level, rollup_version):
+    return daycall_index.build_indexes(level)
+
+def load_names(level):
+    # 선택 목록은 월별 집계에서 이름만 조회 (전체 일별 데이터를 읽지 않음)
+    return list(load_index(level)['monthly']['offsets'])
+
+# 차트는 데이터 버전(과 선택)별로 한 번 만들고 세션마다 복사본을 받음 (plotly Figure는 변경 가능한 객체라 세션 간 공유하지 않음)
+# 긴 일별 시계열은 chart_render에서 점 수를 줄임
+@perf_trace.cache_data('render', max_entries=2)
+def daycall_figures(rollup_version):
+    totals = load_store_totals(rollup_version)
+    df_daycall_daily = totals['total_daily']
 
     # 전체 콜 현황
-    df_daycall['월'] = df_daycall['날짜'].dt.to_period('M')
-    df_month_call = df_daycall.groupby('월')['총처리호'].sum().reset_index()
-    df_month_call['월'] = df_month_call['월'].astype(str)
-    df_month_call = df_month_call.sort_values(by='월', ascending=False)
+    df_month_call = totals['total_monthly'][['월', '총처리호']].sort_values(by='월', ascending=False)
 
     fig3 = px.bar(df_month_call, x='월', y='총처리호', title='월별 총 콜 처리현황')
-    st.plotly_chart(fig3, use_container_width=True)
 
-    fig2 = px.bar(df_daycall_daily, x='날짜', y='총처리호', title='일자별 총 콜 처리현황')
-    st.plotly_chart(fig2, use_container_width=True)
+    fig2 = chart_render.bar(df_daycall_daily, '날짜', '총처리호', title='일자별 총 콜 처리현황')
 
-    fig = px.line(df_daycall_daily, x='날짜', y='총처리호', color='요일', title='요일별 콜 처리현황')
+    fig = chart_render.line(df_daycall_daily, '날짜', '총처리호', color='요일', title='요일별 콜 처리현황')
     fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-    st.plotly_chart(fig, use_container_width=True)
+    return [fig3, fig2, fig]
+
+@perf_trace.traced('render')
+def plot_daycall_charts(totals):
+    if totals['total_daily'].empty:
+        st.warning("No data available to plot.")
+        return
 
-def display_team_data(df_daycall, team_name):
+    for fig in daycall_figures(daycall_rollup.rollup_version()):
+        st.plotly_chart(fig, use_container_width=True)
+
+@perf_trace.traced('render')
+def display_raw_export():
+    # 일별 원본(업체 x 일자) 기간 내보내기
+    last_day = daycall_query.last_day()
+    if last_day is None:
+        return
+    period = st.date_input('raw data 기간', (last_day - pd.Timedelta(days=30), last_day), max_value=last_day)
+    if len(period) != 2:
+        return
+    start_date, end_date = (day.strftime('%Y-%m-%d') for day in period)
+    data_export.export_controls(f'daycall_{start_date}_{end_date}', lambda: data_export.daycall_chunks(start_date, end_date), key='daycall_raw',
+                                n_rows=daycall_store.count_rows(start_date, end_date),
+                                cli=['daycall', f'daycall_{start_date}_{end_date}.csv', '--start', start_date, '--end', end_date])
+
+@perf_trace.traced('render')
+def display_team_data(team_name):
     selected_teams = st.multiselect('조회 대상 부서를 선택하세요', [*team_name])
-    df_selected_teams = df_daycall[df_daycall['팀명'].isin(selected_teams)]
+    team_index = load_index('팀명')
 
     t1, t2 = st.tabs(['월별', '일자별'])
 
     with t1:
-        df_selected_teams['월'] = df_selected_teams['날짜'].dt.to_period('M')
-        df_monthly = df_selected_teams.groupby(['월', '팀명'])['총처리호'].sum().reset_index()
-        df_monthly['월'] = df_monthly['월'].astype(str)
+        # 선택된 부서의 행 구간만 가져옴
+        df_monthly = daycall_index.select(team_index, selected_teams)
 
-        df_pivot_monthly = df_monthly.pivot_table(index='월', columns='팀명', values='총처리호', aggfunc='sum').reset_index()
+        df_pivot_monthly = df_monthly.pivot_table(index='월', columns='팀명', values='총처리호', aggfunc='sum', observed=True).reset_index()
         df_melted_monthly = df_pivot_monthly.melt(id_vars='월', value_vars=df_pivot_monthly.columns[1:], var_name='부서', value_name='처리호')
         df_melted_monthly = df_melted_monthly.dropna()
 
@@ -68,13 +132,14 @@ def display_team_data(df_daycall, team_name):
 
         st.write('*raw data*')
         st.dataframe(df_pivot_monthly)
+        data_export.export_controls('부서별_월별', lambda: data_export.rollup_chunks('팀명', selected_teams, 'monthly'), key='team_monthly',
+                                    n_rows=daycall_query.row_bound('팀명', selected_teams, 'monthly'),
+                                    cli=['team', '부서별_월별.csv', '--monthly', '--names', *selected_teams])
 
     with t2:
-        last_date = df_selected_teams['날짜'].max()
-        start_date = last_date - pd.Timedelta(days=10)
-        df_filtered = df_selected_teams[(df_selected_teams['날짜'] >= start_date) & (df_selected_teams['날짜'] <= last_date)]
+        df_filtered = daycall_index.select_recent(team_index, selected_teams, days=10)
 
-        df_pivot = df_filtered.pivot_table(index='날짜', columns='팀명', values='총처리호', aggfunc='sum').reset_index()
+        df_pivot = df_filtered.pivot_table(index='날짜', columns='팀명', values='총처리호', aggfunc='sum', observed=True).reset_index()
         df_pivot = df_pivot.sort_values(by='날짜', ascending=False)
 
         df_melted = df_pivot.melt(id_vars='날짜', value_vars=df_pivot.columns[1:], var_name='부서', value_name='처리호')
@@ -90,29 +155,69 @@ def display_team_data(df_daycall, team_name):
 
         st.write('*raw data*')
         st.dataframe(df_pivot)
-
-def display_mall_data(df_daycall, mall_name):
-    selected_malls = st.multiselect('업체를 선택하세요', [*mall_name])
-    df_selected_malls = df_daycall[df_daycall['쇼핑몰명'].isin(selected_malls)]
-
-    df_selected_malls['월'] = df_selected_malls['날짜'].dt.to_period('M')
-    df_monthly_mall = df_selected_malls.groupby(['월', '쇼핑몰명'])['총처리호'].sum().reset_index()
-    df_monthly_mall['월'] = df_monthly_mall['월'].astype(str)
-
-    fig_mall_monthly = px.line(df_monthly_mall, x='월', y='총처리호', color='쇼핑몰명', title='월별 업체별 콜 처리 추이')
+        # 내보내기는 화면의 최근 구간이 아니라 선택 부서의 전체 일자
+        data_export.export_controls('부서별_일자별', lambda: data_export.rollup_chunks('팀명', selected_teams, 'daily'), key='team_daily',
+                                    n_rows=daycall_query.row_bound('팀명', selected_teams, 'daily'),
+                                    cli=['team', '부서별_일자별.csv', '--names', *selected_teams])
+
+@perf_trace.cache_data('render', max_entries=32)
+def mall_view(rollup_version, selected_malls):
+    mall_index = load_index('쇼핑몰명')
+    df_monthly_mall = daycall_index.select(mall_index, list(selected_malls))
+
+    # 월별은 점을 줄이지 않고 (업체가 많으면) WebGL로만 그림
+    fig_mall_monthly = chart_render.line(df_monthly_mall, '월', '총처리호', color='쇼핑몰명', max_points=None, title='월별 업체별 콜 처리 추이')
     fig_mall_monthly.update_layout(yaxis_title='처리호', xaxis_title='월', legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-    st.plotly_chart(fig_mall_monthly, use_container_width=True)
 
-    last_date_mall = df_selected_malls['날짜'].max()
-    start_date_mall = last_date_mall - pd.Timedelta(days=90)
-    df_daily_mall = df_selected_malls[(df_selected_malls['날짜'] >= start_date_mall) & (df_selected_malls['날짜'] <= last_date_mall)]
+    # 선택된 업체의 최근 90일만 가져옴
+    df_daily_mall = daycall_index.select_recent(mall_index, list(selected_malls), days=90)
 
-    fig_mall_daily = px.area(df_daily_mall, x='날짜', y='총처리호', color='쇼핑몰명', title='일별 업체별 콜 처리 현황 (90일)')
+    fig_mall_daily = chart_render.area(df_daily_mall, '날짜', '총처리호', '쇼핑몰명', title='일별 업체별 콜 처리 현황 (90일)')
     fig_mall_daily.update_layout(yaxis_title='처리호', xaxis_title='날짜', legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return df_monthly_mall, df_daily_mall, fig_mall_monthly, fig_mall_daily
+
+@perf_trace.traced('render')
+def display_mall_data(mall_name):
+    selected_malls = st.multiselect('업체를 선택하세요', [*mall_name])
+
+    df_monthly_mall, df_daily_mall, fig_mall_monthly, fig_mall_daily = mall_view(daycall_rollup.rollup_version(), tuple(selected_malls))
+    st.plotly_chart(fig_mall_monthly, use_container_width=True)
     st.plotly_chart(fig_mall_daily, use_container_width=True)
 
     st.write('*raw data (월별)*')
     st.dataframe(df_monthly_mall)
+    data_export.export_controls('업체별_월별', lambda: data_export.rollup_chunks('쇼핑몰명', selected_malls, 'monthly'), key='mall_monthly',
+                                n_rows=daycall_query.row_bound('쇼핑몰명', selected_malls, 'monthly'),
+                                cli=['mall', '업체별_월별.csv', '--monthly', '--names', *selected_malls])
 
     st.write('*raw data (일별)*')
     st.dataframe(df_daily_mall[['날짜','쇼핑몰명','총처리호']])
+    data_export.export_controls('업체별_일자별', lambda: data_export.rollup_chunks('쇼핑몰명', selected_malls, 'daily'), key='mall_daily',
+                                n_rows=daycall_query.row_bound('쇼핑몰명', selected_malls, 'daily'),
+                                cli=['mall', '업체별_일자별.csv', '--names', *selected_malls])
+
+@perf_trace.cache_data('aggregate', max_entries=1)
+def load_anomaly_scores(rollup_version, days):
+    return daycall_anomaly.score(daycall_anomaly.load_window(days))
+
+@perf_trace.traced('render')
+def display_anomalies(days=60):
+    # 업체/부서 전체를 한 번에 계산한 z-score에서 기준을 넘은 일자만 표시
+    level = st.radio('탐지 단위', ['쇼핑몰명', '팀명'], horizontal=True, format_func=lambda x: '업체' if x == '쇼핑몰명' else '부서')
+    threshold = st.slider('z-score 기준', 2.0, 6.0, daycall_anomaly.THRESHOLD, 0.5)
+
+    scores = load_anomaly_scores(daycall_rollup.rollup_version(), days)
+    if scores is None:
+        st.warning("No data available to plot.")
+        return
+    since = scores['days'][-min(days, len(scores['days']))]
+    df_flagged = daycall_anomaly.flagged(scores, level, threshold, since=since)
+    st.write(f"최근 {days}영업일 ({since:%Y-%m-%d} ~) 같은 요일 직전 {daycall_anomaly.WEEKS}주 기준선 대비 이상 일자 {len(df_flagged)}건")
+
+    fig = chart_render.scatter(df_flagged, '날짜', 'z', color='구분', hover_data=['팀명', level, '처리호', '기준선'],
+                               color_discrete_map={'급증': 'red', '급감': 'blue'}, title='이상 일자 (z-score)')
+    fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.write('*raw data*')
+    st.dataframe(df_flagged, hide_index=True)
@@ -0,0 +1,92 @@
+# model_cache.py
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+import statsmodels
+
+base_path = os.path.dirname(__file__)
+MODEL_CACHE_DIR = os.path.join(base_path, 'data', 'model_cache')
+
+
+def model_key(series, **params):
+    # 입력 시계열(인덱스 포함) + 모델 파라미터 + statsmodels 버전으로 키 생성
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(series, index=True).values.tobytes())
+    digest.update(repr(sorted(params.items())).encode())
+    digest.update(statsmodels.__version__.encode())
+    return digest.hexdigest()
+
+
+def params_key(**params):
+    return hashlib.sha256(repr(sorted(params.items())).encode() + statsmodels.__version__.encode()).hexdigest()
+
+
+def _model_path(key):
+    return os.path.join(MODEL_CACHE_DIR, f'{key}.pkl')
+
+
+def _latest_path(**params):
+    return os.path.join(MODEL_CACHE_DIR, f'latest_{params_key(**params)}.json')
+
+
+def load_model(key):
+    try:
+        with open(_model_path(key), 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # 없거나 깨진 파일이면 다시 학습
+        return None
+
+
+def save_model(key, fit_result):
+    # 다른 워커 프로세스가 반쯤 쓰인 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    # (임시 파일 이름에 스레드도 넣어 같은 프로세스의 세션들이 같은 모형을 동시에 저장해도 겹치지 않도록)
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    tmp_path = f'{_model_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(fit_result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, _model_path(key))
+
+
+def load_latest(**params):
+    # 같은 파라미터로 마지막에 저장된 모형과 메타정보(마지막 전체 학습 시각)
+    try:
+        with open(_latest_path(**params), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, None
+    return meta, load_model(meta['key'])
+
+
+def save_latest(key, meta, **params):
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    path = _latest_path(**params)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({**meta, 'key': key}, f)
+    os.replace(tmp_path, path)
+
+
+def get_or_fit(series, fit, update=None, **params):
+    # update(previous, series, meta)가 이전 모형을 새 관측치로 갱신할 수 있으면 재학습하지 않음
+    key = model_key(series, **params)
+    fit_result = load_model(key)
+    if fit_result is not None:
+        return fit_result
+
+    meta = None
+    if update is not None:
+        meta, previous = load_latest(**params)
+        if previous is not None:
+            fit_result = update(previous, series, meta)
+    if fit_result is None:
+        fit_result = fit(series, **params)
+        meta = {'fitted_at': time.time()}
+    save_model(key, fit_result)
+    save_latest(key, meta, **params)
+    return fit_result
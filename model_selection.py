@@ -0,0 +1,143 @@
+# model_selection.py
+import argparse
+import itertools
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+import call_schema
+import data_catalog
+import model_cache
+
+base_path = os.path.dirname(__file__)
+SELECTION_DIR = os.path.join(base_path, 'data', 'model_selection')
+
+DEFAULT_ORDER = (1, 1, 1)
+DEFAULT_SEASONAL_ORDER = (2, 0, 1, 12)
+
+# 증분 갱신 대신 전체 재학습을 하는 조건: 마지막 전체 학습 후 경과 일수, 추가 관측치의 예측 오차(MAPE, %)
+REFIT_DAYS = 90
+DRIFT_THRESHOLD = 10.0
+
+
+def fit_sarimax(df_log, order, seasonal_order, maxiter=1000):
+    model = sm.tsa.SARIMAX(df_log, order=order, seasonal_order=seasonal_order, enforce_stationarity=False, enforce_invertibility=False)
+    fit_result = model.fit(disp=False, maxiter=maxiter)
+    return fit_result
+
+
+def update_sarimax(previous, df_log, meta, refit_days=REFIT_DAYS, drift_threshold=DRIFT_THRESHOLD):
+    # 새 스냅샷이 기존 시계열 뒤에 관측치만 추가된 경우, 파라미터 재추정 없이 상태공간 결과에 이어 붙임
+    n_obs = int(previous.nobs)
+    if len(df_log) <= n_obs or not df_log.index[:n_obs].equals(previous.model._index):
+        return None
+    if not np.allclose(previous.model.endog[:, 0], df_log.iloc[:n_obs, 0].to_numpy()):
+        return None
+    if time.time() - meta.get('fitted_at', 0) > refit_days * 86400:
+        return None
+
+    appended = df_log.iloc[n_obs:]
+    forecast = previous.get_forecast(len(appended)).predicted_mean
+    if mape(np.exp(appended.iloc[:, 0].to_numpy()), np.exp(forecast.to_numpy())) > drift_threshold:
+        return None
+    return previous.append(appended)
+
+
+def candidate_grid(p=range(3), d=range(2), q=range(3), P=range(3), D=range(2), Q=range(2), s=12):
+    return [((p_, d_, q_), (P_, D_, Q_, s)) for p_, d_, q_, P_, D_, Q_ in itertools.product(p, d, q, P, D, Q)]
+
+
+def mape(actual, predicted):
+    actual = np.asarray(actual, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    return float(np.mean(np.abs((actual - predicted) / actual)) * 100)
+
+
+def backtest(df_log, order, seasonal_order, n_origins=6, horizon=6, maxiter=1000):
+    # rolling-origin: 마지막 n_origins개 시점마다 그 이전 데이터로 학습하고 horizon개월을 예측
+    actuals, predictions = [], []
+    last_origin = len(df_log) - 1
+    for origin in range(last_origin - n_origins + 1, last_origin + 1):
+        train = df_log.iloc[:origin]
+        test = df_log.iloc[origin:origin + horizon]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            fit_result = fit_sarimax(train, order, seasonal_order, maxiter=maxiter)
+        forecast = fit_result.get_forecast(len(test)).predicted_mean
+        actuals.append(np.exp(test.iloc[:, 0].to_numpy()))
+        predictions.append(np.exp(forecast.to_numpy()))
+    return mape(np.concatenate(actuals), np.concatenate(predictions))
+
+
+def _evaluate_candidate(args):
+    df_log, order, seasonal_order, n_origins, horizon, maxiter = args
+    try:
+        score = backtest(df_log, order, seasonal_order, n_origins=n_origins, horizon=horizon, maxiter=maxiter)
+    except Exception:
+        score = float('nan')
+    return {'order': list(order), 'seasonal_order': list(seasonal_order), 'mape': score}
+
+
+def _selection_path(df_log, n_origins, horizon):
+    key = model_cache.model_key(df_log, kind='selection', n_origins=n_origins, horizon=horizon)
+    return os.path.join(SELECTION_DIR, f'{key}.json')
+
+
+def select_model(df_log, grid=None, n_origins=6, horizon=6, maxiter=1000, max_workers=None):
+    # 후보 모형별 백테스트를 프로세스 풀에서 병렬 실행하고, 후보별 MAPE를 파일로 기록
+    grid = candidate_grid() if grid is None else grid
+    tasks = [(df_log, order, seasonal_order, n_origins, horizon, maxiter) for order, seasonal_order in grid]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        candidates = list(executor.map(_evaluate_candidate, tasks, chunksize=max(1, len(tasks) // ((max_workers or os.cpu_count() or 1) * 4))))
+
+    candidates = sorted(candidates, key=lambda c: (np.isnan(c['mape']), c['mape']))
+    selection = {'n_origins': n_origins, 'horizon': horizon, 'best': candidates[0], 'candidates': candidates}
+
+    os.makedirs(SELECTION_DIR, exist_ok=True)
+    path = _selection_path(df_log, n_origins, horizon)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(selection, f, indent=1)
+    os.replace(tmp_path, path)
+    return selection
+
+
+def load_selection(df_log, n_origins=6, horizon=6):
+    # 같은 시계열로 실행된 탐색 결과가 없으면 None
+    try:
+        with open(_selection_path(df_log, n_origins, horizon), encoding='utf-8') as f:
+            selection = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    best = selection['best']
+    best['order'] = tuple(best['order'])
+    best['seasonal_order'] = tuple(best['seasonal_order'])
+    return selection
+
+
+def load_month_call_log(file_path):
+    df, _ = call_schema.read_month_call_csv(file_path)
+    df = df[['ds', 'y']].set_index('ds')
+    df.index.freq = 'MS'
+    return np.log(df)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SARIMAX 후보 모형 rolling-origin 백테스트')
+    parser.add_argument('file_path', nargs='?', help='month_call_YYYY-MM.csv 경로 (생략 시 data_catalog의 최신 유효 스냅샷)')
+    parser.add_argument('--n-origins', type=int, default=6)
+    parser.add_argument('--horizon', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--default-only', action='store_true', help='후보 탐색 없이 기본 모형의 백테스트 MAPE만 기록 (빠름)')
+    args = parser.parse_args()
+
+    file_path = args.file_path or data_catalog.latest_valid('month_call_total')['path']
+    grid = [(DEFAULT_ORDER, DEFAULT_SEASONAL_ORDER)] if args.default_only else None
+    selection = select_model(load_month_call_log(file_path), grid=grid, n_origins=args.n_origins, horizon=args.horizon, max_workers=args.workers)
+    print(pd.DataFrame(selection['candidates']).head(10).to_string())
@@ -0,0 +1,206 @@
+# perf_trace.py
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+
+import streamlit as st
+
+# rerun 단위로 load/aggregate/fit/render 구간의 소요시간, 최대 메모리, 캐시 적중 여부를 기록
+# (Streamlit은 세션마다 별도 스레드에서 스크립트를 실행하므로 진행 중인 rerun 기록은 스레드별로 보관)
+_local = threading.local()
+HISTORY_LIMIT = 100
+# 설정하면 rerun마다 구간 기록을 JSON lines로 덧붙임 (오프라인 분석용)
+PERF_LOG_PATH = os.environ.get('SIIC_PERF_LOG')
+# tracemalloc은 프로세스 전체에 적용되므로, 메모리 측정을 켠 세션이 하나라도 있으면 켜 두고 모두 끄면 멈춤
+# (창을 닫은 세션은 끄지 못하므로 마지막 rerun 후 MEMORY_SESSION_TTL초가 지나면 제외)
+MEMORY_SESSION_TTL = 600
+_memory_sessions = {}
+# 스레드별 진행 중인 구간: 다른 세션의 구간과 겹치면 peak(reset_peak 공유)는 참고용으로 표시
+_open_stacks = {}
+_lock = threading.Lock()
+
+
+def _update_tracing(session_id, wants_memory):
+    now = time.monotonic()
+    with _lock:
+        if wants_memory:
+            _memory_sessions[session_id] = now
+        else:
+            _memory_sessions.pop(session_id, None)
+        for other, last_seen in list(_memory_sessions.items()):
+            if now - last_seen > MEMORY_SESSION_TTL:
+                del _memory_sessions[other]
+        if _memory_sessions and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _memory_sessions and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def start_rerun():
+    session_id = st.session_state.setdefault('perf_trace_session', uuid.uuid4().hex)
+    _update_tracing(session_id, bool(st.session_state.get('perf_trace_memory')))
+    st.session_state['perf_trace_rerun'] = st.session_state.get('perf_trace_rerun', 0) + 1
+    _local.rerun = st.session_state['perf_trace_rerun']
+    _local.memory = bool(st.session_state.get('perf_trace_memory'))
+    _local.started = time.perf_counter()
+    _local.spans = []
+    _local.stack = []
+    with _lock:
+        _open_stacks[threading.get_ident()] = _local.stack
+
+
+def _mark_overlaps(entry):
+    # 새 구간과 다른 스레드에서 열려 있는 구간을 서로 겹침으로 표시
+    me = threading.get_ident()
+    with _lock:
+        others = [stack for thread_id, stack in _open_stacks.items() if thread_id != me and stack]
+        if others:
+            entry['_overlap'] = True
+        for stack in others:
+            for other in stack:
+                other['_overlap'] = True
+
+
+@contextlib.contextmanager
+def span(name, step=None):
+    # rerun 밖(배치 스크립트, 벤치마크)에서는 기록하지 않음
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        yield {}
+        return
+
+    stack = _local.stack
+    entry = {'rerun': _local.rerun, 'name': name, 'step': step, 'depth': len(stack), 'cache': None, '_overlap': False}
+    if tracemalloc.is_tracing():
+        _mark_overlaps(entry)
+    tracing = tracemalloc.is_tracing() and _local.memory
+    if tracing:
+        # 중첩 구간: 부모의 최대값을 보관한 뒤 peak를 초기화하고, 끝날 때 부모에게 자식의 최대값을 넘김
+        current, peak = tracemalloc.get_traced_memory()
+        if stack and '_max' in stack[-1]:
+            stack[-1]['_max'] = max(stack[-1]['_max'], peak)
+        tracemalloc.reset_peak()
+        entry['_start'], entry['_max'] = current, current
+    spans.append(entry)
+    stack.append(entry)
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry['seconds'] = time.perf_counter() - start
+        stack.pop()
+        entry['peak_mb'] = None
+        entry['peak_advisory'] = False
+        if tracing and tracemalloc.is_tracing():
+            entry['_max'] = max(entry['_max'], tracemalloc.get_traced_memory()[1])
+            entry['peak_mb'] = (entry['_max'] - entry['_start']) / 2**20
+            # 다른 세션의 구간과 겹쳤으면 그 세션의 할당/reset_peak가 섞인 값
+            entry['peak_advisory'] = entry['_overlap']
+            if stack and '_max' in stack[-1]:
+                stack[-1]['_max'] = max(stack[-1]['_max'], entry['_max'])
+        entry.pop('_start', None)
+        entry.pop('_max', None)
+        entry.pop('_overlap', None)
+
+
+def traced(step, name=None):
+    def decorator(func):
+        span_name = name or f'{func.__module__}.{func.__name__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, step):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def mark_cache(state):
+    # 진행 중인 구간의 캐시 상태 (hit: 프로세스 내 캐시, shared: 프로세스 간 공유 캐시, miss: 계산)
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1]['cache'] = state
+
+
+def cache_data(step, name=None, **cache_kwargs):
+    # st.cache_data와 같고, 호출마다 함수 본문이 실제로 실행됐는지(miss) 캐시에서 반환됐는지(hit)를 기록
+    return _cached(st.cache_data, step, name, **cache_kwargs)
+
+
+def cache_resource(step, name=None, **cache_kwargs):
+    # st.cache_resource 버전: 반환 객체를 복사하지 않고 세션 간 공유 (읽기 전용으로만 사용)
+    return _cached(st.cache_resource, step, name, **cache_kwargs)
+
+
+def _cached(st_cache, step, name=None, **cache_kwargs):
+    def decorator(func):
+        span_name = name or f'{func.__module__}.{func.__name__}'
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            mark_cache('miss')
+            return func(*args, **kwargs)
+
+        cached = st_cache(compute, **cache_kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, step) as entry:
+                entry['cache'] = 'hit'
+                return cached(*args, **kwargs)
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def finish_rerun():
+    # 진행 중인 rerun 기록을 세션 이력에 옮기고 (설정 시) 파일에 덧붙임
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        return []
+    spans.insert(0, {'rerun': _local.rerun, 'name': 'rerun', 'step': None, 'depth': -1, 'cache': None,
+                     'seconds': time.perf_counter() - _local.started, 'peak_mb': None, 'peak_advisory': False})
+    with _lock:
+        _open_stacks.pop(threading.get_ident(), None)
+    recorded_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    for entry in spans:
+        entry['recorded_at'] = recorded_at
+    history = st.session_state.setdefault('perf_trace_history', [])
+    history.extend(spans)
+    reruns = sorted({entry['rerun'] for entry in history})
+    if len(reruns) > HISTORY_LIMIT:
+        oldest_kept = reruns[-HISTORY_LIMIT]
+        history[:] = [entry for entry in history if entry['rerun'] >= oldest_kept]
+
+    if PERF_LOG_PATH:
+        with open(PERF_LOG_PATH, 'a', encoding='utf-8') as f:
+            for entry in spans:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    _local.spans = None
+    return spans
+
+
+def to_jsonl(entries):
+    return ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+
+
+def display_panel():
+    spans = finish_rerun()
+    with st.sidebar.expander('성능 측정 (debug)'):
+        st.checkbox('최대 메모리 측정 (tracemalloc, 다음 rerun부터)', key='perf_trace_memory')
+        if not spans:
+            return
+        rows = [{'구간': '  ' * entry['depth'] + entry['name'], 'step': entry['step'], 'seconds': round(entry['seconds'], 3),
+                 'peak_mb': entry['peak_mb'] and round(entry['peak_mb'], 3), 'peak 참고용': entry['peak_advisory'],
+                 'cache': entry['cache']} for entry in spans[1:]]
+        st.caption(f"rerun #{spans[0]['rerun']} · 전체 {spans[0]['seconds']:.3f}s")
+        if any(entry['peak_advisory'] for entry in spans):
+            st.caption('peak 참고용: 다른 세션의 구간과 동시에 실행되어 최대 메모리에 그 세션의 할당이 섞였을 수 있음')
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.download_button('JSON lines 다운로드', to_jsonl(st.session_state['perf_trace_history']),
+                           file_name='siic_perf_trace.jsonl', mime='application/x-ndjson')
@@ -0,0 +1,53 @@
+# profit_kpi.py
+import pandas as pd
+
+measures = ['매출', '지출', '손익']
+
+
+def to_long(profit_df):
+    # 매출:*/지출:* 컬럼을 (날짜, 서비스) 단위 long form으로 한 번만 변환. 지출 컬럼이 없는 서비스는 지출 0
+    id_cols = ['날짜', '연도', '월', '분기']
+    revenue = profit_df.melt(id_vars=id_cols, value_vars=[col for col in profit_df.columns if col.startswith('매출:')],
+                             var_name='서비스', value_name='매출')
+    expense = profit_df.melt(id_vars=id_cols, value_vars=[col for col in profit_df.columns if col.startswith('지출:')],
+                             var_name='서비스', value_name='지출')
+    revenue['서비스'] = revenue['서비스'].str.split(':', n=1).str[1]
+    expense['서비스'] = expense['서비스'].str.split(':', n=1).str[1]
+    long_df = revenue.merge(expense, on=[*id_cols, '서비스'], how='outer')
+    long_df[['매출', '지출']] = long_df[['매출', '지출']].fillna(0).astype('int64')
+    long_df['손익'] = long_df['매출'] - long_df['지출']
+    return long_df.sort_values(['서비스', '날짜']).reset_index(drop=True)
+
+
+def build_kpi_tables(profit_df):
+    # 모든 서비스 x 연도에 대해 누계, 당월/전월, 전월대비, 분기 합계를 한 번의 grouped 연산으로 계산
+    long_df = to_long(profit_df)
+    keys = ['서비스', '연도']
+
+    monthly = long_df.groupby([*keys, '월'], sort=True)[measures].sum().reset_index()
+    kpi = monthly.groupby(keys)[['매출', '손익']].sum().add_prefix('누계')
+    kpi['당월'] = monthly.groupby(keys)['월'].max()
+    # 전월은 같은 연도 안에서만 찾음 (해당 월 데이터가 없으면 0)
+    kpi['전월'] = (pd.to_datetime(kpi['당월']) - pd.DateOffset(months=1)).dt.strftime('%Y-%m')
+    kpi = kpi.reset_index()
+
+    by_month = monthly.set_index([*keys, '월'])[['매출', '손익']]
+    last = by_month.reindex(pd.MultiIndex.from_frame(kpi[[*keys, '당월']])).fillna(0).to_numpy()
+    previous = by_month.reindex(pd.MultiIndex.from_frame(kpi[[*keys, '전월']])).fillna(0).to_numpy()
+    kpi['당월매출'], kpi['당월손익'] = last[:, 0].astype('int64'), last[:, 1].astype('int64')
+    kpi['매출증감'] = kpi['당월매출'] - previous[:, 0].astype('int64')
+    kpi['손익증감'] = kpi['당월손익'] - previous[:, 1].astype('int64')
+
+    quarterly = long_df.groupby([*keys, '분기'], sort=True)[['매출', '손익']].sum().reset_index()
+    return {'monthly': monthly, 'kpi': kpi.set_index(keys), 'quarterly': quarterly}
+
+
+def service_kpis(kpi_tables, service, year):
+    # 화면 표시용 KPI 딕셔너리 (기존 calculate_kpis와 같은 형태)
+    row = kpi_tables['kpi'].loc[(service, year)]
+    return {
+        f'{year}년도 매출누계액': row['누계매출'],
+        f'{year}년도 손익누계액': row['누계손익'],
+        '당월 매출액': (row['당월매출'], row['매출증감']),
+        '당월 손익': (row['당월손익'], row['손익증감']),
+    }
@@ -1,8 +1,26 @@
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-import openai
 
+import data_catalog
+import data_export
+import perf_trace
+import profit_kpi
+import profit_store
+import result_cache
+
+@perf_trace.cache_data('load', max_entries=1)
+def load_profit_data(workbook_path, checksum):
+    # 워크북이 바뀌면(checksum) 파생 컬럼까지 계산된 parquet으로 한 번만 변환
+    return profit_store.load_profit(workbook_path, checksum)
+
+@perf_trace.cache_data('aggregate', max_entries=1)
+@result_cache.shared('profit_kpis', version_arg=1)
+def load_profit_kpis(workbook_path, checksum):
+    # 서비스 x 연도 KPI/월별/분기별 테이블을 데이터 버전당 한 번만 계산
+    return profit_kpi.build_kpi_tables(load_profit_data(workbook_path, checksum))
+
+@perf_trace.traced('render')
 def display_profit_page():
     with st.sidebar:
         st.markdown("""
@@ -34,31 +52,22 @@ def display_profit_page():
             </style>
             """, unsafe_allow_html=True)
 
+    profit_file = data_catalog.latest_valid('profit_month')
+    if profit_file is None:
+        st.error("No valid profit_month workbook found.")
+        return
     try:
-        profit_df = pd.read_excel('data/profit_month/profit_month.xlsx')
+        profit_df = load_profit_data(profit_file['path'], profit_file['checksum'])
+        kpi_tables = load_profit_kpis(profit_file['path'], profit_file['checksum'])
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return
-    profit_df['날짜'] = pd.to_datetime(profit_df['날짜'])
-    profit_df['연도'] = profit_df['날짜'].dt.year
-    profit_df['월'] = profit_df['날짜'].dt.strftime("%Y-%m")
-    profit_df['분기'] = profit_df['날짜'].dt.to_period('Q').astype(str)
-
-    profit_df['매출:전체'] = profit_df[[col for col in profit_df.columns if col.startswith('매출:')]].sum(axis=1)
-    profit_df['지출:전체'] = profit_df[[col for col in profit_df.columns if col.startswith('지출:')]].sum(axis=1)
-    profit_df['손익:전체'] = profit_df['매출:전체'] - profit_df['지출:전체']
 
-    def calculate_profit(df, options):
-        result = {}
-        for option in options:
-            revenue_col = f'매출:{option}'
-            expense_col = f'지출:{option}'
-            
-            if revenue_col in df.columns and expense_col in df.columns:
-                df = df.copy()
-                df[f'손익:{option}'] = df[revenue_col] - df[expense_col]
-                result[option] = df[['월', revenue_col, expense_col, f'손익:{option}']]
-        return result
+    def calculate_profit(years, options):
+        monthly = kpi_tables['monthly'][kpi_tables['monthly']['연도'].isin(years)]
+        monthly_by_service = dict(tuple(monthly.groupby('서비스')))
+        return {option: monthly_by_service[option][['월', '매출', '지출', '손익']].reset_index(drop=True)
+                for option in options if option in monthly_by_service}
 
     years = sorted(profit_df['연도'].unique(), reverse=True)
     selected_total_years = st.multiselect('전체 매출 연도를 선택하세요', years, default=[years[0]])
@@ -90,47 +99,18 @@ def display_profit_page():
 
         with st.expander("전체 데이터 보기"):
             st.dataframe(total_data)
+            data_export.export_controls('profit_month', lambda: data_export.profit_chunks(profit_file['path'], profit_file['checksum']), key='profit_raw')
         
         if 'gpt_result' in st.session_state:
             st.write(st.session_state['gpt_result'])
 
-    def calculate_kpis(data, option, year):
-        kpis = {}
-        current_year_data = data[(data['연도'] == year)].copy()
-        
-        if f'손익:{option}' not in current_year_data.columns:
-            current_year_data[f'손익:{option}'] = current_year_data[f'매출:{option}'] - current_year_data[f'지출:{option}']
-        
-        current_year_revenue = current_year_data[f'매출:{option}'].sum()
-        current_year_profit = current_year_data[f'손익:{option}'].sum()
-
-        last_month = current_year_data['월'].max()
-        last_month_data = current_year_data[current_year_data['월'] == last_month]
-        last_month_revenue = last_month_data[f'매출:{option}'].sum()
-        last_month_profit = last_month_data[f'손익:{option}'].sum()
-
-        previous_month = (pd.to_datetime(last_month) - pd.DateOffset(months=1)).strftime("%Y-%m")
-        previous_month_data = current_year_data[current_year_data['월'] == previous_month]
-        previous_month_revenue = previous_month_data[f'매출:{option}'].sum()
-        previous_month_profit = previous_month_data[f'손익:{option}'].sum()
+    def calculate_kpis(option, year):
+        return profit_kpi.service_kpis(kpi_tables, option, year)
 
-        revenue_delta = last_month_revenue - previous_month_revenue
-        profit_delta = last_month_profit - previous_month_profit
-
-        kpis[f'{year}년도 매출누계액'] = current_year_revenue
-        kpis[f'{year}년도 손익누계액'] = current_year_profit
-        kpis['당월 매출액'] = (last_month_revenue, revenue_delta)
-        kpis['당월 손익'] = (last_month_profit, profit_delta)
-
-        return kpis
-
-    def generate_quarterly_charts(data, option, year):
-        quarterly_data = data[(data['연도'] == year)].copy()
-        
-        if f'손익:{option}' not in quarterly_data.columns:
-            quarterly_data[f'손익:{option}'] = quarterly_data[f'매출:{option}'] - quarterly_data[f'지출:{option}']
-
-        quarterly_data = quarterly_data.groupby('분기')[[f'매출:{option}', f'손익:{option}']].sum().reset_index()
+    def generate_quarterly_charts(option, year):
+        quarterly_data = kpi_tables['quarterly']
+        quarterly_data = quarterly_data[(quarterly_data['서비스'] == option) & (quarterly_data['연도'] == year)]
+        quarterly_data = quarterly_data[['분기', '매출', '손익']].rename(columns={'매출': f'매출:{option}', '손익': f'손익:{option}'})
         
         fig = px.bar(quarterly_data, x='분기', y=[f'매출:{option}', f'손익:{option}'],
                      barmode='group', title=f'{option} 분기별 매출 및 손익',
@@ -152,7 +132,7 @@ def display_profit_page():
         return fig
 
     with col2:
-        kpis_total = calculate_kpis(profit_df, '전체', selected_total_years[0])
+        kpis_total = calculate_kpis('전체', selected_total_years[0])
         kpi_keys = list(kpis_total.keys())
         for j in range(0, len(kpi_keys), 2):
             cols = st.columns(2)
@@ -175,7 +155,7 @@ def display_profit_page():
                         </div>
                         """, unsafe_allow_html=True)
 
-        fig = generate_quarterly_charts(profit_df, '전체', selected_total_years[0])
+        fig = generate_quarterly_charts('전체', selected_total_years[0])
         st.plotly_chart(fig)
     '''---'''
     zz1, zz2, zz3 = st.tabs(['서비스별','tab1','tab2'])
@@ -186,18 +166,11 @@ def display_profit_page():
             ['통합상담', 'INC', '스마트팀', '전담상담', '카페24'],
             default=['통합상담', 'INC', '스마트팀', '전담상담', '카페24'])
     
-        filtered_detail_df = profit_df[profit_df['연도'].isin(selected_detail_years)]
-        selected_data = calculate_profit(filtered_detail_df, options)
+        selected_data = calculate_profit(selected_detail_years, options)
     
         for i, (option, data) in enumerate(selected_data.items()):
             col1, col2 = st.columns([3, 1])
             with col1:
-                data = data.rename(columns={
-                    f'매출:{option}': '매출',
-                    f'지출:{option}': '지출',
-                    f'손익:{option}': '손익'
-                })
-                
                 fig = px.bar(data, x='월', y=['매출', '지출', '손익'],
                              barmode='group', title=f'{option} 매출, 지출, 손익',
                              color_discrete_map={
@@ -222,7 +195,7 @@ def display_profit_page():
                     st.dataframe(data)
     
             with col2:
-                kpis = calculate_kpis(profit_df, option, selected_detail_years[0])
+                kpis = calculate_kpis(option, selected_detail_years[0])
                 kpi_keys = list(kpis.keys())
                 for j in range(0, len(kpi_keys), 2):
                     cols = st.columns(2)
@@ -245,7 +218,7 @@ def display_profit_page():
                                 </div>
                                 """, unsafe_allow_html=True)
                 
-                fig = generate_quarterly_charts(profit_df, option, selected_detail_years[0])
+                fig = generate_quarterly_charts(option, selected_detail_years[0])
                 st.plotly_chart(fig)
             '''---'''
 
@@ -0,0 +1,76 @@
+# profit_store.py
+import glob
+import os
+import threading
+
+import pandas as pd
+
+import data_catalog
+
+base_path = os.path.dirname(__file__)
+STORE_DIR = os.path.join(base_path, 'data', 'profit_store')
+# 같은 프로세스의 세션(스레드)들이 같은 임시 파일에 동시에 변환하지 않도록 변환은 한 번에 하나만
+_convert_lock = threading.Lock()
+
+
+def prepare_profit(profit_df):
+    # 연도/월/분기와 매출:전체/지출:전체/손익:전체를 변환 시점에 한 번만 계산
+    profit_df['날짜'] = pd.to_datetime(profit_df['날짜'])
+    profit_df['연도'] = profit_df['날짜'].dt.year.astype('int16')
+    profit_df['월'] = profit_df['날짜'].dt.strftime("%Y-%m")
+    profit_df['분기'] = profit_df['날짜'].dt.to_period('Q').astype(str)
+    # 빈 칸(연중에 새로 생긴 서비스 열 등)은 0으로 보고 정수로 변환
+    input_cols = [col for col in profit_df.columns if col.split(':')[0] in ('매출', '지출', '손익')]
+    profit_df[input_cols] = profit_df[input_cols].fillna(0)
+
+    profit_df['매출:전체'] = profit_df[[col for col in profit_df.columns if col.startswith('매출:')]].sum(axis=1)
+    profit_df['지출:전체'] = profit_df[[col for col in profit_df.columns if col.startswith('지출:')]].sum(axis=1)
+    profit_df['손익:전체'] = profit_df['매출:전체'] - profit_df['지출:전체']
+    amount_cols = [col for col in profit_df.columns if col.split(':')[0] in ('매출', '지출', '손익')]
+    profit_df[amount_cols] = profit_df[amount_cols].astype('int64')
+    return profit_df
+
+
+def _parquet_path(checksum):
+    return os.path.join(STORE_DIR, f'profit_month_{checksum[:16]}.parquet')
+
+
+def convert_workbook(workbook_path, checksum):
+    # 워크북 checksum이 같으면 기존 parquet을 그대로 사용하고, 바뀌었을 때만 openpyxl로 다시 변환
+    parquet_path = _parquet_path(checksum)
+    if os.path.exists(parquet_path):
+        return parquet_path
+    with _convert_lock:
+        # 기다리는 동안 다른 세션이 변환을 마쳤으면 그대로 사용
+        if not os.path.exists(parquet_path):
+            _convert(workbook_path, parquet_path)
+    return parquet_path
+
+
+def _convert(workbook_path, parquet_path):
+    profit_df = prepare_profit(pd.read_excel(workbook_path))
+    os.makedirs(STORE_DIR, exist_ok=True)
+    tmp_path = f'{parquet_path}.{os.getpid()}.tmp'
+    profit_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+
+    # 이전 버전 변환 파일 정리
+    for old_path in glob.glob(os.path.join(STORE_DIR, 'profit_month_*.parquet')):
+        if old_path != parquet_path:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                # 다른 프로세스가 이미 정리함
+                pass
+
+
+def load_profit(workbook_path, checksum):
+    return pd.read_parquet(convert_workbook(workbook_path, checksum))
+
+
+def load_latest_profit():
+    # data_catalog의 최신 유효 profit_month 워크북 기준
+    workbook = data_catalog.latest_valid('profit_month')
+    if workbook is None:
+        raise FileNotFoundError('No valid profit_month workbook found.')
+    return load_profit(workbook['path'], workbook['checksum'])
@@ -0,0 +1,238 @@
+# report_builder.py
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import call_schema
+import daycall_store
+import data_catalog
+import profit_kpi
+import profit_store
+
+base_path = os.path.dirname(__file__)
+REPORT_DIRS = {
+    'month': os.path.join(base_path, 'data', 'report', 'siic_month'),
+    'day': os.path.join(base_path, 'data', 'report', 'siic_day'),
+}
+REPORT_MANIFEST_PATH = os.path.join(base_path, 'data', 'report', '_generated.json')
+# 시트당 최대 행 수 (헤더 포함 1,048,576행)
+XLSX_MAX_ROWS = 1_048_575
+# 시트 이름 최대 길이
+XLSX_MAX_TITLE = 31
+
+
+def report_path(kind, period):
+    return os.path.join(REPORT_DIRS[kind], f'siic_{kind}_report_{period}.xlsx')
+
+
+def _input_fingerprint(kind, period):
+    # 보고서 입력(워크북/스냅샷 checksum, 해당 기간 daycall 파티션)이 같으면 같은 값
+    if kind == 'month':
+        month_start = f'{period}-01'
+        month_end = (pd.Timestamp(month_start) + pd.offsets.MonthEnd(0)).strftime('%Y-%m-%d')
+        profit_file = data_catalog.latest_valid('profit_month')
+        month_call_file = data_catalog.latest_valid('month_call_total')
+        inputs = [profit_file and profit_file['checksum'], month_call_file and month_call_file['checksum'],
+                  daycall_store.partition_signatures(month_start, month_end)]
+    else:
+        inputs = [daycall_store.partition_signatures(f'{period[:7]}-01', period)]
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+
+
+def _read_report_manifest():
+    try:
+        with open(REPORT_MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_report_manifest(manifest):
+    os.makedirs(os.path.dirname(REPORT_MANIFEST_PATH), exist_ok=True)
+    tmp_path = f'{REPORT_MANIFEST_PATH}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, REPORT_MANIFEST_PATH)
+
+
+def _cell(value):
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value
+
+
+def _sheet_title(sheet_name, sheet_count):
+    # 이어 쓰는 시트는 ' (n)'을 붙여도 길이 제한을 넘지 않도록 원래 이름을 먼저 자름
+    if sheet_count == 1:
+        return sheet_name[:XLSX_MAX_TITLE]
+    suffix = f' ({sheet_count})'
+    return sheet_name[:XLSX_MAX_TITLE - len(suffix)] + suffix
+
+
+def write_xlsx(path, sheets):
+    # openpyxl write-only 모드: 행을 바로 흘려 쓰므로 메모리가 시트 크기에 비례하지 않음
+    # 시트 값은 DataFrame 또는 DataFrame 청크의 iterable. 시트 행 수 제한을 넘으면 '(2)', '(3)' 시트로 이어 씀
+    # openpyxl은 xlsx를 쓸 때만 필요하므로 화면(내보내기 버튼이 있는 탭) 시작 시 import하지 않음
+    from openpyxl import Workbook
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    workbook = Workbook(write_only=True)
+    for sheet_name, chunks in sheets.items():
+        chunks = [chunks] if isinstance(chunks, pd.DataFrame) else chunks
+        sheet, sheet_count, rows = None, 0, 0
+        for df in chunks:
+            header = [str(col) for col in df.columns]
+            for row in df.itertuples(index=False, name=None):
+                if sheet is None or rows == XLSX_MAX_ROWS:
+                    sheet_count += 1
+                    sheet = workbook.create_sheet(_sheet_title(sheet_name, sheet_count))
+                    sheet.append(header)
+                    rows = 0
+                sheet.append([_cell(value) for value in row])
+                rows += 1
+            if sheet is None:
+                sheet_count += 1
+                sheet = workbook.create_sheet(_sheet_title(sheet_name, sheet_count))
+                sheet.append(header)
+        if sheet is None:
+            workbook.create_sheet(_sheet_title(sheet_name, 1))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _call_summary(df_daycall, key):
+    summary = df_daycall.groupby(key, observed=True)[['총처리호', '응대호', '발신호']].sum()
+    summary['일평균'] = (summary['총처리호'] / max(df_daycall['날짜'].nunique(), 1)).round(1)
+    return summary.sort_values('총처리호', ascending=False).reset_index()
+
+
+def monthly_report(period):
+    month_start = pd.Timestamp(f'{period}-01')
+    month_end = month_start + pd.offsets.MonthEnd(0)
+    sheets = {}
+
+    profit_file = data_catalog.latest_valid('profit_month')
+    if profit_file is not None:
+        monthly = profit_kpi.build_kpi_tables(profit_store.load_profit(profit_file['path'], profit_file['checksum']))['monthly']
+        monthly = monthly[(monthly['연도'] == month_start.year) & (monthly['월'] <= period)]
+        # 해당 연도 손익 데이터가 없는 기간(예: 손익 파일 갱신 전 새해 1월)은 시트를 만들지 않음
+        if not monthly.empty:
+            profit = monthly.pivot_table(index='월', columns='서비스', values=['매출', '손익'], aggfunc='sum')
+            profit.columns = [f'{service} {measure}' for measure, service in profit.columns]
+            profit = profit.reset_index()
+            if '전체 손익' in profit.columns:
+                profit['전체 손익 누계'] = profit['전체 손익'].cumsum()
+            sheets['매출 손익'] = profit
+
+    month_call_file = data_catalog.latest_valid('month_call_total')
+    if month_call_file is not None:
+        df_month_call, _ = call_schema.read_month_call_csv(month_call_file['path'])
+        sheets['월별 콜'] = df_month_call.loc[df_month_call['ds'] <= month_end, ['ds', 'y']].rename(columns={'ds': '월', 'y': '총처리호'})
+
+    df_daycall = daycall_store.read_store(month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d'))
+    if not df_daycall.empty:
+        sheets['부서별 콜'] = _call_summary(df_daycall, '팀명')
+        sheets['업체별 콜'] = _call_summary(df_daycall, '쇼핑몰명')
+    return sheets
+
+
+def daily_report(day):
+    df_month_to_date = daycall_store.read_store(f'{day[:7]}-01', day)
+    if df_month_to_date.empty:
+        return {}
+    df_day = df_month_to_date[df_month_to_date['날짜'] == pd.Timestamp(day)]
+    sheets = {}
+    for sheet_name, key in [('부서별', '팀명'), ('업체별', '쇼핑몰명')]:
+        daily = df_day.groupby(key, observed=True)[['총처리호', '응대호', '발신호']].sum()
+        month_to_date = df_month_to_date.groupby(key, observed=True)['총처리호'].sum().rename('월누계 총처리호')
+        sheets[sheet_name] = daily.join(month_to_date, how='outer').fillna(0).astype('int64') \
+            .sort_values('총처리호', ascending=False).reset_index()
+    return sheets
+
+
+def _build(task):
+    # 기간 하나가 실패해도 풀의 나머지 기간은 계속 생성하도록 예외를 결과로 돌려줌
+    kind, period, fingerprint = task
+    try:
+        sheets = monthly_report(period) if kind == 'month' else daily_report(period)
+        if not sheets:
+            return kind, period, None, None
+        write_xlsx(report_path(kind, period), sheets)
+    except Exception as e:
+        return kind, period, None, f'{type(e).__name__}: {e}'
+    return kind, period, fingerprint, None
+
+
+def default_periods(kind):
+    days = daycall_store.stored_days()
+    if kind == 'day':
+        return days
+    periods = {day[:7] for day in days}
+    profit_file = data_catalog.latest_valid('profit_month')
+    if profit_file is not None:
+        periods |= set(profit_store.load_profit(profit_file['path'], profit_file['checksum'])['월'])
+    return sorted(periods)
+
+
+def build_reports(kind, periods=None, max_workers=None, force=False):
+    # 입력이 바뀐 기간만 프로세스 풀에서 병렬 생성 (새 daycall 파일은 먼저 저장소에 반영)
+    for daycall_file in data_catalog.date_range('mall_daycall'):
+        daycall_store.ingest_csv(daycall_file['path'])
+    periods = default_periods(kind) if periods is None else periods
+    manifest = _read_report_manifest()
+    tasks = []
+    for period in periods:
+        fingerprint = _input_fingerprint(kind, period)
+        path = report_path(kind, period)
+        if not force and os.path.exists(path) and manifest.get(os.path.relpath(path, base_path)) == fingerprint:
+            continue
+        tasks.append((kind, period, fingerprint))
+
+    built, failed = [], []
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for kind_, period, fingerprint, error in executor.map(_build, tasks):
+                if error is not None:
+                    failed.append((period, error))
+                elif fingerprint is not None:
+                    manifest[os.path.relpath(report_path(kind_, period), base_path)] = fingerprint
+                    built.append(period)
+        _write_report_manifest(manifest)
+    return built, len(periods) - len(tasks), failed
+
+
+def list_reports(kind):
+    # 생성된 보고서 (기간 내림차순)
+    folder = REPORT_DIRS[kind]
+    if not os.path.isdir(folder):
+        return []
+    prefix = f'siic_{kind}_report_'
+    periods = [file_name[len(prefix):-len('.xlsx')] for file_name in os.listdir(folder)
+               if file_name.startswith(prefix) and file_name.endswith('.xlsx')]
+    return sorted(periods, reverse=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SIIC 월간/일간 보고서 일괄 생성')
+    parser.add_argument('kind', choices=['month', 'day'])
+    parser.add_argument('periods', nargs='*', help='YYYY-MM (month) 또는 YYYY-MM-DD (day). 생략 시 데이터가 있는 전체 기간')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='입력이 바뀌지 않은 기간도 다시 생성')
+    args = parser.parse_args()
+
+    built, skipped, failed = build_reports(args.kind, args.periods or None, max_workers=args.workers, force=args.force)
+    print(f'{args.kind}: built {len(built)}, skipped {skipped} unchanged, failed {len(failed)} -> {REPORT_DIRS[args.kind]}')
+    for period, error in failed:
+        print(f'  {period} failed: {error}')
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,32 @@
+# report_page.py
+import os
+
+import pandas as pd
+import streamlit as st
+
+import report_builder
+
+@st.cache_data
+def load_report(path, mtime):
+    with open(path, 'rb') as f:
+        content = f.read()
+    return content, pd.read_excel(path, sheet_name=None)
+
+def display_report_page(kind):
+    # report_builder.py 배치가 미리 만들어 둔 보고서를 조회/다운로드
+    periods = report_builder.list_reports(kind)
+    if not periods:
+        st.warning(f"생성된 보고서가 없습니다. python report_builder.py {kind} 배치를 먼저 실행하세요.")
+        return
+
+    period = st.selectbox('보고 기간을 선택하세요', periods)
+    path = report_builder.report_path(kind, period)
+    content, sheets = load_report(path, os.path.getmtime(path))
+
+    st.download_button('xlsx 다운로드', content, file_name=os.path.basename(path),
+                       mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+    tabs = st.tabs(list(sheets))
+    for tab, (sheet_name, df) in zip(tabs, sheets.items()):
+        with tab:
+            st.dataframe(df, use_container_width=True)
@@ -0,0 +1,128 @@
+# result_cache.py
+import argparse
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+
+import pandas as pd
+
+import perf_trace
+
+base_path = os.path.dirname(__file__)
+CACHE_DIR = os.path.join(base_path, 'data', 'result_cache')
+CACHE_PATH = os.path.join(CACHE_DIR, 'results.sqlite')
+# 전체 캐시 크기 상한 (넘으면 가장 오래 조회되지 않은 결과부터 삭제)
+MAX_BYTES = int(os.environ.get('SIIC_RESULT_CACHE_MB', '1024')) * 2**20
+
+
+def _connect():
+    # 여러 Streamlit 프로세스가 같은 파일을 읽고 쓰므로 WAL 모드 사용
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    connection = sqlite3.connect(CACHE_PATH, timeout=30, isolation_level=None)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, namespace TEXT, version TEXT, '
+                       'size INTEGER, created REAL, accessed REAL, value BLOB)')
+    connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+    return connection
+
+
+def _token(value):
+    # 인자 값을 키로 변환: DataFrame/Series는 내용 해시, 나머지는 repr
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return hashlib.sha256(pd.util.hash_pandas_object(value, index=True).values.tobytes()).hexdigest()
+    return repr(value)
+
+
+def get(key):
+    with contextlib.closing(_connect()) as connection:
+        row = connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        connection.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+    try:
+        return pickle.loads(row[0])
+    except Exception:
+        return None
+
+
+def put(key, namespace, version, value):
+    value_bytes = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(value_bytes) > MAX_BYTES:
+        return
+    now = time.time()
+    with contextlib.closing(_connect()) as connection:
+        connection.execute('BEGIN IMMEDIATE')
+        # 같은 결과의 이전 데이터 버전(manifest/checksum)은 더 이상 조회되지 않으므로 바로 삭제
+        connection.execute('DELETE FROM results WHERE namespace = ? AND version != ?', (namespace, version))
+        connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                           (key, namespace, version, len(value_bytes), now, now, value_bytes))
+        _evict(connection)
+        connection.execute('COMMIT')
+
+
+def _evict(connection):
+    total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+    if total <= MAX_BYTES:
+        return
+    for key, size in connection.execute('SELECT key, size FROM results ORDER BY accessed').fetchall():
+        connection.execute('DELETE FROM results WHERE key = ?', (key,))
+        total -= size
+        if total <= MAX_BYTES:
+            break
+
+
+def invalidate(namespace=None):
+    with contextlib.closing(_connect()) as connection:
+        if namespace is None:
+            connection.execute('DELETE FROM results')
+        else:
+            connection.execute('DELETE FROM results WHERE namespace = ?', (namespace,))
+
+
+def stats():
+    with contextlib.closing(_connect()) as connection:
+        rows = connection.execute('SELECT namespace, COUNT(*), SUM(size), MAX(accessed) FROM results GROUP BY namespace').fetchall()
+    return pd.DataFrame(rows, columns=['namespace', 'entries', 'bytes', 'last_accessed'])
+
+
+def shared(namespace, version_arg=0):
+    # 프로세스 간 공유 결과 캐시. version_arg 위치의 인자(데이터 manifest 버전, checksum 등)가 바뀌면
+    # 이전 버전 결과는 무효화됨. 프로세스 내 캐시(st.cache_data) 안쪽에 두어 miss일 때만 조회
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tokens = [_token(arg) for arg in args] + [f'{name}={_token(value)}' for name, value in sorted(kwargs.items())]
+            key = hashlib.sha256('\x1f'.join([namespace, *tokens]).encode()).hexdigest()
+            version = tokens[version_arg] if len(tokens) > version_arg else ''
+            try:
+                value = get(key)
+            except sqlite3.Error:
+                return func(*args, **kwargs)
+            if value is not None:
+                perf_trace.mark_cache('shared')
+                return value
+            value = func(*args, **kwargs)
+            try:
+                put(key, namespace, version, value)
+            except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+                # 캐시 저장 실패는 결과에 영향이 없으므로 무시
+                pass
+            return value
+        return wrapper
+    return decorator
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='공유 결과 캐시 조회/정리')
+    parser.add_argument('command', choices=['stats', 'clear'])
+    parser.add_argument('--namespace', default=None)
+    args = parser.parse_args()
+
+    if args.command == 'clear':
+        invalidate(args.namespace)
+    print(stats().to_string(index=False))